@@ -1,4 +1,6 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import json
 import csv
@@ -17,6 +19,19 @@ from io import BytesIO
 
 app = Flask(__name__)
 
+# Shared HTTP session so repeated IMDb requests reuse pooled keep-alive connections
+REQUEST_TIMEOUT = (5, 30)
+
+session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET', 'HEAD'), raise_on_status=False)
+)
+session.mount('https://', _adapter)
+session.mount('http://', _adapter)
+
 # Scraping functions
 def parse_url(url):
     headers = {
@@ -27,7 +42,7 @@ def parse_url(url):
         'Upgrade-Insecure-Requests': '1'
     }
     try:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         content = response.content
         encoding = response.encoding if 'charset' in response.headers.get('content-type', '').lower() else 'utf-8'
@@ -47,7 +62,7 @@ def scrape_movie_image(imdb_id):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
     try:
-        response = requests.get(url, headers=headers)
+        response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, 'html.parser')
         urls = []
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+RATING_BINS = np.arange(0, 10.5, 0.5)
+METASCORE_BINS = np.arange(0, 105, 5)
+REVIEW_PERCENTILES = (10, 25, 50, 75, 90, 99)
+TOP_DIRECTORS = 20
+
+
+def as_float(column):
+    return column.to_numpy(dtype=float, na_value=np.nan)
+
+
+def distribution(column, bins):
+    values = as_float(column)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    return pd.DataFrame({'start': edges[:-1], 'end': edges[1:], 'count': counts})
+
+
+def group_stats(codes, size, columns):
+    # Per-group counts and NaN-aware means in one bincount pass per column
+    stats = {'films': np.bincount(codes, minlength=size)}
+    for name, values in columns.items():
+        present = ~np.isnan(values)
+        totals = np.bincount(codes, weights=np.where(present, values, 0.0), minlength=size)
+        counts = np.bincount(codes, weights=present, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats[name] = totals / counts if name.startswith('mean_') else totals
+    return stats
+
+
+def director_stats(movies, people, limit=TOP_DIRECTORS):
+    directors = people.loc[people['role'] == 'director', ['title_id', 'name']]
+    rows = pd.Index(movies['title_id']).get_indexer(directors['title_id'])
+    names = directors['name'].to_numpy(dtype=object)[rows >= 0]
+    rows = rows[rows >= 0]
+
+    codes, uniques = pd.factorize(names)
+    stats = pd.DataFrame(group_stats(codes, len(uniques), {
+        'mean_rating': as_float(movies['rating'])[rows],
+        'mean_metascore': as_float(movies['metascore'])[rows],
+        'user_reviews': as_float(movies['user_reviews'])[rows]
+    }))
+    stats.insert(0, 'name', uniques)
+    return stats.sort_values(['films', 'mean_rating'], ascending=False).head(limit).reset_index(drop=True)
+
+
+def category_stats(movies):
+    codes, uniques = pd.factorize(movies['certificate'].to_numpy(dtype=object, na_value='Unrated'))
+    stats = pd.DataFrame(group_stats(codes, len(uniques), {
+        'mean_rating': as_float(movies['rating']),
+        'mean_duration': as_float(movies['duration_minutes']),
+        'user_reviews': as_float(movies['user_reviews'])
+    }))
+    stats.insert(0, 'certificate', uniques)
+    return stats.sort_values('films', ascending=False).reset_index(drop=True)
+
+
+def year_trends(movies):
+    years = as_float(movies['year'])
+    present = ~np.isnan(years)
+    codes, uniques = pd.factorize(years[present].astype(int), sort=True)
+    stats = pd.DataFrame(group_stats(codes, len(uniques), {
+        'mean_rating': as_float(movies['rating'])[present],
+        'mean_metascore': as_float(movies['metascore'])[present]
+    }))
+    stats.insert(0, 'year', uniques)
+    return stats
+
+
+def review_percentiles(movies, percentiles=REVIEW_PERCENTILES):
+    data = {'percentile': list(percentiles)}
+    for column in ('user_reviews', 'critic_reviews'):
+        values = as_float(movies[column])
+        values = values[~np.isnan(values)]
+        data[column] = np.percentile(values, percentiles) if len(values) else [np.nan] * len(percentiles)
+    return pd.DataFrame(data)
+
+
+def compute_catalog_aggregates(movies, people):
+    return {
+        'ratings': distribution(movies['rating'], RATING_BINS),
+        'metascores': distribution(movies['metascore'], METASCORE_BINS),
+        'directors': director_stats(movies, people),
+        'categories': category_stats(movies),
+        'years': year_trends(movies),
+        'review_percentiles': review_percentiles(movies)
+    }
+
+
+def catalog_aggregates(dataset):
+    # Each loaded dataset is an immutable snapshot, so its aggregates are computed once and kept on it;
+    # they go away with the dataset when a reload replaces it
+    if dataset.aggregates is None:
+        dataset.aggregates = compute_catalog_aggregates(dataset.tables['movies'], dataset.tables['people'])
+    return dataset.aggregates
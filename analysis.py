@@ -1,315 +1,225 @@
-import csv
-import ast
-import base64
 from io import BytesIO
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from flask import Response, abort, request
 import plotly.graph_objs as go
 from wordcloud import WordCloud
-from textblob import TextBlob
 from collections import Counter
-import pandas as pd
-
-
-def load_csv_file(file_path):
-    try:
-        with open(file_path, 'r', newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            data = list(reader)
-        return data
-    except FileNotFoundError:
-        print(f"File '{file_path}' not found.")
-    except Exception as e:
-        print(f"Error loading CSV file '{file_path}': {e}")
-    return None
-
-def extract_movie_data(csv_data):
-    movies_data = []
-    directors_films = {}
-    genres_data = Counter()
-
-    for movie in csv_data:
-        try:
-            movie_data = {
-                "movie_name": movie.get("movie_name", "").strip(),
-                "movie_imdb_id": movie.get("movie_imdb_id", "").strip(),
-                "publish_year": ast.literal_eval(movie.get("YearDuration", "[]"))[0].strip() if movie.get("YearDuration") else "",
-                "movie_category": ast.literal_eval(movie.get("YearDuration", "[]"))[1].strip() if movie.get("YearDuration") else "",
-                "duration": ast.literal_eval(movie.get("YearDuration", "[]"))[2].strip() if movie.get("YearDuration") else "",
-                "rating": float(ast.literal_eval(movie.get("Ratings", "[]"))[0].strip()) if movie.get("Ratings") else 0.0,
-                "user_reviews": int(ast.literal_eval(movie.get("ReviewRelatedInfo", "[]"))[0].get("User reviews", "0").strip()) if movie.get("ReviewRelatedInfo") else 0,
-                "critic_reviews": int(ast.literal_eval(movie.get("ReviewRelatedInfo", "[]"))[1].get("Critic reviews", "0").strip()) if movie.get("ReviewRelatedInfo") else 0,
-                "metascore": int(ast.literal_eval(movie.get("ReviewRelatedInfo", "[]"))[2].get("Metascore", "0").strip()) if movie.get("ReviewRelatedInfo") else 0,
-                "film_plot": movie.get("FilmPlot", "").strip(),
-                "user_reviews_data": [{"Rating": ur["Rating"].strip(), "Title": ur["Title"].strip(), "Content": ur["Content"].strip()} for ur in ast.literal_eval(movie.get("UserReviews", "[]"))] if movie.get("UserReviews") else [],
-                "directors": ast.literal_eval(movie.get("Directors", "[]")) if movie.get("Directors") else []
-            }
-
-            for director in movie_data["directors"]:
-                director_name = director.strip()
-                if director_name not in directors_films:
-                    directors_films[director_name] = []
-                directors_films[director_name].append(movie_data["movie_name"])
-
-            genres_data[movie_data["movie_category"]] += 1
-
-            movies_data.append(movie_data)
-        
-        except Exception as e:
-            print(f"Error processing movie data: {e}")
-
-    return movies_data, directors_films, genres_data
+from urllib.parse import urlencode
+from aggregates import catalog_aggregates
+from movie_data import MovieDataSource
+from movie_store import TERM_SOURCES
+from result_cache import ResultCache
+from sentiment import sentiment_category
+
+DEFAULT_GENRE = 'action'
 
 # Function to generate wordcloud
-def generate_wordcloud_text(text):
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
+def generate_wordcloud_frequencies(frequencies):
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(frequencies)
     return wordcloud
 
-# Function to generate sentiment analysis
-def analyze_sentiment(text):
-    analysis = TextBlob(text)
-    return analysis.sentiment.polarity
+WORDCLOUD_CACHE_SIZE = 128
+WORDCLOUD_MAX_AGE = 24 * 60 * 60
+
+# Keyed on the genre's file signature rather than the dataset itself, so superseded datasets aren't kept alive
+wordcloud_cache = ResultCache('wordclouds', ttl=WORDCLOUD_MAX_AGE, max_entries=WORDCLOUD_CACHE_SIZE)
+
+def draw_wordcloud(term_frequencies, source, title_ids):
+    frequencies = Counter()
+    for title_id in title_ids:
+        frequencies.update(term_frequencies.get((title_id, source), {}))
+    if not frequencies:
+        return None
+
+    buffer = BytesIO()
+    generate_wordcloud_frequencies(frequencies).to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def render_wordcloud(dataset, source, title_ids):
+    # Cached per data version and sorted selection, so a reload never serves a stale image
+    key = (dataset.genre, dataset.signature, source, title_ids)
+    return wordcloud_cache.get_or_compute(key, lambda: draw_wordcloud(dataset.term_frequencies, source, title_ids))
+
+def wordcloud_url(dataset, source, movies):
+    title_ids = sorted({movie['movie_imdb_id'] for movie in movies})
+    if not title_ids:
+        return ''
+    return f"/wordcloud/{dataset.genre}/{source}.png?" + urlencode({'ids': ','.join(title_ids), 'v': dataset.version})
 
 # Initialize Dash app
 app = dash.Dash(__name__)
 
-# Load CSV file and extract movie data
-file_path = 'csv_files/movies_data-action.csv'
-csv_data = load_csv_file(file_path)
-if not csv_data:
-    print("Error in csv file")
-else:
-    movies_data, directors_films, genres_data = extract_movie_data(csv_data)
-
-# Dash app layout
-app.layout = html.Div([
-    html.H1("Movie Analysis Dashboard", style={'textAlign': 'center'}),
-
-    html.Div([
-        html.Label("Select a Movie:"),
-        dcc.Dropdown(
-            id='movie-dropdown',
-            options=[{'label': movie['movie_name'], 'value': movie['movie_name']} for movie in movies_data],
-            value=movies_data[0]['movie_name'] if movies_data else '',
-            clearable=False
-        ),
-    ], style={'width': '50%', 'margin': 'auto', 'textAlign': 'center', 'padding': '10px'}),
-
-    html.Div([
-        html.Label("Compare Movies:"),
-        dcc.Dropdown(
-            id='compare-movies-dropdown',
-            options=[{'label': movie['movie_name'], 'value': movie['movie_name']} for movie in movies_data],
-            multi=True,
-            value=[movies_data[0]['movie_name']] if movies_data else []
-        ),
-    ], style={'width': '50%', 'margin': 'auto', 'textAlign': 'center', 'padding': '10px'}),
-
-    html.Div(id='overview-analysis', style={'padding': '20px'}),
-    
-    html.Div(id='movie-info', style={'padding': '20px'}),
-
-    html.Div([
-        dcc.Graph(id='ratings-histogram'),
-        dcc.Graph(id='reviews-analysis'),
-    ], className='row', style={'padding': '20px'}),
-
-    html.Div([
-        dcc.Graph(id='metascore-histogram'),
-        html.Img(id='wordcloud-image', style={'width': '100%', 'display': 'block', 'margin': 'auto'}),
-    ], className='row', style={'padding': '20px'}),
-
-    dcc.Graph(id='sentiment-analysis', style={'padding': '20px'}),
-
-    html.Div([
+# Genres are loaded on first use and reloaded in the background when the scraper writes new output
+data_source = MovieDataSource()
+data_source.start()
+
+@app.server.route('/wordcloud/<genre>/<source>.png')
+def wordcloud_image(genre, source):
+    title_ids = tuple(sorted({title_id for title_id in request.args.get('ids', '').split(',') if title_id}))
+    dataset = data_source.get(genre) if genre in data_source.genres() else None
+    if source not in TERM_SOURCES or not title_ids or dataset is None:
+        abort(404)
+
+    image = render_wordcloud(dataset, source, title_ids)
+    if image is None:
+        abort(404)
+
+    # The URL changes with the selection and the data version, so browsers may keep the image
+    response = Response(image, mimetype='image/png')
+    response.cache_control.public = True
+    response.cache_control.max_age = WORDCLOUD_MAX_AGE
+    response.add_etag()
+    return response.make_conditional(request)
+
+# Dash app layout, built per page load so newly scraped genres show up
+def serve_layout():
+    genres = data_source.genres()
+    genre = DEFAULT_GENRE if DEFAULT_GENRE in genres else (genres[0] if genres else None)
+
+    return html.Div([
+        html.H1("Movie Analysis Dashboard", style={'textAlign': 'center'}),
+
         html.Div([
-            html.H3('Word Cloud of Film Plots', style={'textAlign': 'center'}),
-            html.Img(id='film-plot-wordcloud', style={'width': '100%', 'display': 'block', 'margin': 'auto'})
-        ], className='six columns'),
+            html.Label("Select a Genre:"),
+            dcc.Dropdown(
+                id='genre-dropdown',
+                options=[{'label': genre.title(), 'value': genre} for genre in genres],
+                value=genre,
+                clearable=False
+            ),
+        ], style={'width': '50%', 'margin': 'auto', 'textAlign': 'center', 'padding': '10px'}),
 
         html.Div([
-            dcc.Graph(id='directors-films-bar'),
-            dcc.Graph(id='genre-distribution-pie'),
-        ], className='six columns'),
-    ], className='row', style={'padding': '20px'}),
+            html.Label("Select a Movie:"),
+            dcc.Dropdown(
+                id='movie-dropdown',
+                clearable=False
+            ),
+        ], style={'width': '50%', 'margin': 'auto', 'textAlign': 'center', 'padding': '10px'}),
 
-    dcc.Graph(id='sentiment-analysis-categories', style={'padding': '20px'})
-])
+        html.Div([
+            html.Label("Compare Movies:"),
+            dcc.Dropdown(
+                id='compare-movies-dropdown',
+                multi=True
+            ),
+        ], style={'width': '50%', 'margin': 'auto', 'textAlign': 'center', 'padding': '10px'}),
 
-# Callbacks
-@app.callback(
-    Output('overview-analysis', 'children'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_overview_analysis(selected_movies):
-    if not selected_movies:
-        return html.Div()
+        html.Div(id='overview-analysis', style={'padding': '20px'}),
 
-    overview_data = []
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie:
-            overview_data.append(movie)
-    
-    return html.Div([
-        html.H2("Overview Analysis"),
-        html.P(f"Total Movies Selected: {len(overview_data)}"),
-        html.P(f"Average Rating: {sum(movie['rating'] for movie in overview_data) / len(overview_data):.2f}"),
-        html.P(f"Total User Reviews: {sum(movie['user_reviews'] for movie in overview_data)}"),
-        html.P(f"Total Critic Reviews: {sum(movie['critic_reviews'] for movie in overview_data)}")
+        html.Div(id='movie-info', style={'padding': '20px'}),
+
+        html.Div([
+            dcc.Graph(id='ratings-histogram'),
+            dcc.Graph(id='reviews-analysis'),
+        ], className='row', style={'padding': '20px'}),
+
+        html.Div([
+            dcc.Graph(id='metascore-histogram'),
+            html.Img(id='wordcloud-image', style={'width': '100%', 'display': 'block', 'margin': 'auto'}),
+        ], className='row', style={'padding': '20px'}),
+
+        dcc.Graph(id='sentiment-analysis', style={'padding': '20px'}),
+
+        html.Div([
+            html.Div([
+                html.H3('Word Cloud of Film Plots', style={'textAlign': 'center'}),
+                html.Img(id='film-plot-wordcloud', style={'width': '100%', 'display': 'block', 'margin': 'auto'})
+            ], className='six columns'),
+
+            html.Div([
+                dcc.Graph(id='directors-films-bar'),
+                dcc.Graph(id='genre-distribution-pie'),
+            ], className='six columns'),
+        ], className='row', style={'padding': '20px'}),
+
+        dcc.Graph(id='sentiment-analysis-categories', style={'padding': '20px'}),
+
+        html.H2("Catalog Overview", style={'textAlign': 'center'}),
+
+        html.Div([
+            dcc.Graph(id='catalog-ratings'),
+            dcc.Graph(id='catalog-metascores'),
+        ], className='row', style={'padding': '20px'}),
+
+        dcc.Graph(id='catalog-year-trends', style={'padding': '20px'}),
+
+        html.Div([
+            dcc.Graph(id='catalog-directors'),
+            dcc.Graph(id='catalog-categories'),
+        ], className='row', style={'padding': '20px'}),
+
+        dcc.Graph(id='catalog-review-percentiles', style={'padding': '20px'})
     ])
 
-@app.callback(
-    Output('movie-info', 'children'),
-    Input('movie-dropdown', 'value')
-)
-def update_movie_info(selected_movie):
-    if not selected_movie:
-        return html.Div()
+app.layout = serve_layout
 
-    movie = next((m for m in movies_data if m['movie_name'] == selected_movie), None)
-    if not movie:
+# Figures for the compared movies
+def overview_analysis(dataset, movies):
+    if not movies:
         return html.Div()
 
     return html.Div([
-        html.H2(movie['movie_name']),
-        html.P(f"Year: {movie['publish_year']}"),
-        html.P(f"Category: {movie['movie_category']}"),
-        html.P(f"Duration: {movie['duration']}"),
-        html.P(f"Rating: {movie['rating']}"),
-        html.P(f"Metascore: {movie['metascore']}"),
-        html.P(f"Film Plot: {movie['film_plot']}")
+        html.H2("Overview Analysis"),
+        html.P(f"Total Movies Selected: {len(movies)}"),
+        html.P(f"Average Rating: {sum(movie['rating'] for movie in movies) / len(movies):.2f}"),
+        html.P(f"Total User Reviews: {sum(movie['user_reviews'] for movie in movies)}"),
+        html.P(f"Total Critic Reviews: {sum(movie['critic_reviews'] for movie in movies)}")
     ])
 
-@app.callback(
-    Output('ratings-histogram', 'figure'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_ratings_histogram(selected_movies):
-    if not selected_movies:
+def ratings_histogram(dataset, movies):
+    if not movies:
         return {}
 
     fig = go.Figure()
 
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie and movie['rating']:
-            fig.add_trace(go.Histogram(x=[movie['rating']], name=movie_name, opacity=0.75))
+    for movie in movies:
+        if movie['rating']:
+            fig.add_trace(go.Histogram(x=[movie['rating']], name=dataset.movie_label(movie), opacity=0.75))
 
     fig.update_layout(title='Distribution of Ratings', xaxis_title='Rating', yaxis_title='Count', barmode='overlay')
     return fig
 
-@app.callback(
-    Output('reviews-analysis', 'figure'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_reviews_analysis(selected_movies):
-    if not selected_movies:
+def reviews_analysis(dataset, movies):
+    if not movies:
         return {}
 
     fig = go.Figure()
 
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie:
-            user_reviews = [movie['user_reviews']]
-            critic_reviews = [movie['critic_reviews']]
-            fig.add_trace(go.Histogram(x=user_reviews, name=f'User Reviews - {movie_name}', marker_color='blue', opacity=0.75))
-            fig.add_trace(go.Histogram(x=critic_reviews, name=f'Critic Reviews - {movie_name}', marker_color='green', opacity=0.75))
+    for movie in movies:
+        movie_name = dataset.movie_label(movie)
+        user_reviews = [movie['user_reviews']]
+        critic_reviews = [movie['critic_reviews']]
+        fig.add_trace(go.Histogram(x=user_reviews, name=f'User Reviews - {movie_name}', marker_color='blue', opacity=0.75))
+        fig.add_trace(go.Histogram(x=critic_reviews, name=f'Critic Reviews - {movie_name}', marker_color='green', opacity=0.75))
 
     fig.update_layout(title='Distribution of Reviews', xaxis_title='Number of Reviews', yaxis_title='Count', barmode='overlay')
     return fig
 
-@app.callback(
-    Output('metascore-histogram', 'figure'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_metascore_histogram(selected_movies):
-    if not selected_movies:
+def metascore_histogram(dataset, movies):
+    if not movies:
         return {}
 
     fig = go.Figure()
 
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie and movie['metascore']:
-            fig.add_trace(go.Histogram(x=[movie['metascore']], name=movie_name, opacity=0.75))
+    for movie in movies:
+        if movie['metascore']:
+            fig.add_trace(go.Histogram(x=[movie['metascore']], name=dataset.movie_label(movie), opacity=0.75))
 
     fig.update_layout(title='Distribution of Metascores', xaxis_title='Metascore', yaxis_title='Count', barmode='overlay')
     return fig
 
-@app.callback(
-    Output('wordcloud-image', 'src'),
-    Input('movie-dropdown', 'value')
-)
-def update_wordcloud_image(selected_movie):
-    if not selected_movie:
-        return ''
-
-    movie = next((m for m in movies_data if m['movie_name'] == selected_movie), None)
-    if not movie:
-        return ''
-
-    all_reviews = " ".join(review["Content"] for review in movie["user_reviews_data"])
-    wordcloud = generate_wordcloud_text(all_reviews)
-
-    buffer = BytesIO()
-    wordcloud.to_image().save(buffer, format='PNG')
-    image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-    return f'data:image/png;base64,{image_base64}'
-
-@app.callback(
-    Output('sentiment-analysis', 'figure'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_sentiment_analysis(selected_movies):
-    if not selected_movies:
-        return {}
-
-    fig = go.Figure()
-
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie and movie['user_reviews_data']:
-            sentiment_scores = [analyze_sentiment(review['Content']) for review in movie['user_reviews_data']]
-            fig.add_trace(go.Histogram(x=sentiment_scores, name=movie_name, opacity=0.75))
-
-    fig.update_layout(title='Distribution of Sentiment Scores', xaxis_title='Sentiment Score', yaxis_title='Count', barmode='overlay')
-    return fig
-
-@app.callback(
-    Output('film-plot-wordcloud', 'src'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_film_plot_wordcloud(selected_movies):
-    if not selected_movies:
-        return ''
-
-    all_plots = " ".join(movie['film_plot'] for movie_name in selected_movies for movie in movies_data if movie['movie_name'] == movie_name)
-    wordcloud = generate_wordcloud_text(all_plots)
-
-    buffer = BytesIO()
-    wordcloud.to_image().save(buffer, format='PNG')
-    image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-    return f'data:image/png;base64,{image_base64}'
-
-@app.callback(
-    Output('directors-films-bar', 'figure'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_directors_films_bar(selected_movies):
-    if not selected_movies:
+def directors_films_bar(dataset, movies):
+    if not movies:
         return {}
 
     director_counts = Counter()
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie:
-            for director in movie["directors"]:
-                director_counts[director] += 1
+    for movie in movies:
+        for director in movie["directors"]:
+            director_counts[director] += 1
 
     directors = list(director_counts.keys())
     films_count = list(director_counts.values())
@@ -318,19 +228,13 @@ def update_directors_films_bar(selected_movies):
     fig.update_layout(title='Number of Films per Director', xaxis_title='Director', yaxis_title='Number of Films')
     return fig
 
-@app.callback(
-    Output('genre-distribution-pie', 'figure'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_genre_distribution_pie(selected_movies):
-    if not selected_movies:
+def genre_distribution_pie(dataset, movies):
+    if not movies:
         return {}
 
     genre_counts = Counter()
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie:
-            genre_counts[movie["movie_category"]] += 1
+    for movie in movies:
+        genre_counts[movie["movie_category"]] += 1
 
     labels = list(genre_counts.keys())
     values = list(genre_counts.values())
@@ -339,30 +243,28 @@ def update_genre_distribution_pie(selected_movies):
     fig.update_layout(title='Distribution of Movie Genres')
     return fig
 
-@app.callback(
-    Output('sentiment-analysis-categories', 'figure'),
-    Input('compare-movies-dropdown', 'value')
-)
-def update_sentiment_analysis_categories(selected_movies):
-    if not selected_movies:
+def sentiment_analysis(dataset, movies):
+    if not movies:
+        return {}
+
+    fig = go.Figure()
+
+    for movie in movies:
+        if movie['user_reviews_data']:
+            sentiment_scores = [review['Sentiment'] for review in movie['user_reviews_data']]
+            fig.add_trace(go.Histogram(x=sentiment_scores, name=dataset.movie_label(movie), opacity=0.75))
+
+    fig.update_layout(title='Distribution of Sentiment Scores', xaxis_title='Sentiment Score', yaxis_title='Count', barmode='overlay')
+    return fig
+
+def sentiment_analysis_categories(dataset, movies):
+    if not movies:
         return {}
 
     sentiment_scores = []
-    for movie_name in selected_movies:
-        movie = next((m for m in movies_data if m['movie_name'] == movie_name), None)
-        if movie:
-            for review in movie["user_reviews_data"]:
-                analysis = TextBlob(review["Content"])
-                polarity = analysis.sentiment.polarity
-
-                if polarity > 0:
-                    sentiment_category = 'Positive'
-                elif polarity < 0:
-                    sentiment_category = 'Negative'
-                else:
-                    sentiment_category = 'Neutral'
-
-                sentiment_scores.append(sentiment_category)
+    for movie in movies:
+        for review in movie["user_reviews_data"]:
+            sentiment_scores.append(sentiment_category(review["Sentiment"]))
 
     sentiment_counts = Counter(sentiment_scores)
     labels = list(sentiment_counts.keys())
@@ -372,5 +274,196 @@ def update_sentiment_analysis_categories(selected_movies):
     fig.update_layout(title='Sentiment Analysis', xaxis_title='Sentiment Category', yaxis_title='Count')
     return fig
 
+def film_plot_wordcloud(dataset, movies):
+    return wordcloud_url(dataset, 'plot', movies)
+
+# Figures for the whole catalog of a genre
+def distribution_bar(distribution, title, xaxis_title):
+    fig = go.Figure(data=[go.Bar(
+        x=(distribution['start'] + distribution['end']) / 2,
+        y=distribution['count'],
+        width=distribution['end'] - distribution['start'],
+        marker_color='steelblue'
+    )])
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title='Number of Films', bargap=0.05)
+    return fig
+
+def year_trends_figure(years):
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=years['year'], y=years['films'], name='Films', marker_color='lightgray'))
+    fig.add_trace(go.Scatter(x=years['year'], y=years['mean_rating'], name='Average Rating', yaxis='y2', mode='lines+markers'))
+    fig.update_layout(
+        title='Films and Average Rating by Year', xaxis_title='Year', yaxis_title='Number of Films',
+        yaxis2={'title': 'Average Rating', 'overlaying': 'y', 'side': 'right', 'range': [0, 10]}
+    )
+    return fig
+
+def director_stats_figure(directors):
+    fig = go.Figure(data=[go.Bar(
+        x=directors['name'], y=directors['films'], marker_color='lightsalmon',
+        customdata=directors['mean_rating'], hovertemplate='%{x}<br>Films: %{y}<br>Average Rating: %{customdata:.2f}<extra></extra>'
+    )])
+    fig.update_layout(title='Directors with the Most Films', xaxis_title='Director', yaxis_title='Number of Films')
+    return fig
+
+def category_stats_figure(categories):
+    fig = go.Figure(data=[go.Bar(
+        x=categories['certificate'], y=categories['films'], marker_color='mediumseagreen',
+        customdata=categories['mean_rating'], hovertemplate='%{x}<br>Films: %{y}<br>Average Rating: %{customdata:.2f}<extra></extra>'
+    )])
+    fig.update_layout(title='Films per Category', xaxis_title='Category', yaxis_title='Number of Films')
+    return fig
+
+def review_percentiles_figure(percentiles):
+    labels = [f"p{percentile}" for percentile in percentiles['percentile']]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=labels, y=percentiles['user_reviews'], name='User Reviews', marker_color='blue'))
+    fig.add_trace(go.Bar(x=labels, y=percentiles['critic_reviews'], name='Critic Reviews', marker_color='green'))
+    fig.update_layout(title='Review Count Percentiles', xaxis_title='Percentile', yaxis_title='Number of Reviews', barmode='group')
+    return fig
+
+# Callbacks
+@app.callback(
+    Output('movie-dropdown', 'value'),
+    Output('compare-movies-dropdown', 'value'),
+    Input('genre-dropdown', 'value')
+)
+def update_movie_selection(genre):
+    dataset = data_source.get(genre)
+    if dataset is None or not dataset.movies_data:
+        return '', []
+
+    first_movie = dataset.movies_data[0]['movie_imdb_id']
+    return first_movie, [first_movie]
+
+# Dropdown options are searched on the server as the user types
+@app.callback(
+    Output('movie-dropdown', 'options'),
+    Input('movie-dropdown', 'search_value'),
+    Input('movie-dropdown', 'value'),
+    State('genre-dropdown', 'value')
+)
+def search_movie_options(search_value, selected_movie, genre):
+    dataset = data_source.get(genre)
+    if dataset is None:
+        raise PreventUpdate
+    return dataset.search_options(search_value, [selected_movie] if selected_movie else [])
+
+@app.callback(
+    Output('compare-movies-dropdown', 'options'),
+    Input('compare-movies-dropdown', 'search_value'),
+    Input('compare-movies-dropdown', 'value'),
+    State('genre-dropdown', 'value')
+)
+def search_compare_options(search_value, selected_movies, genre):
+    dataset = data_source.get(genre)
+    if dataset is None:
+        raise PreventUpdate
+    return dataset.search_options(search_value, selected_movies)
+
+@app.callback(
+    Output('movie-info', 'children'),
+    Input('movie-dropdown', 'value'),
+    State('genre-dropdown', 'value')
+)
+def update_movie_info(selected_movie, genre):
+    dataset = data_source.get(genre)
+    if not selected_movie or dataset is None:
+        return html.Div()
+
+    movie = dataset.lookup_movie(selected_movie)
+    if not movie:
+        return html.Div()
+
+    return html.Div([
+        html.H2(movie['movie_name']),
+        html.P(f"Year: {movie['publish_year']}"),
+        html.P(f"Category: {movie['movie_category']}"),
+        html.P(f"Duration: {movie['duration']}"),
+        html.P(f"Rating: {movie['rating']}"),
+        html.P(f"Metascore: {movie['metascore']}"),
+        html.P(f"Film Plot: {movie['film_plot']}")
+    ])
+
+@app.callback(
+    Output('wordcloud-image', 'src'),
+    Input('movie-dropdown', 'value'),
+    State('genre-dropdown', 'value')
+)
+def update_wordcloud_image(selected_movie, genre):
+    dataset = data_source.get(genre)
+    if not selected_movie or dataset is None:
+        return ''
+
+    movie = dataset.lookup_movie(selected_movie)
+    if not movie:
+        return ''
+
+    return wordcloud_url(dataset, 'reviews', [movie])
+
+# One request resolves the comparison selection once and returns every summary figure
+@app.callback(
+    Output('overview-analysis', 'children'),
+    Output('ratings-histogram', 'figure'),
+    Output('reviews-analysis', 'figure'),
+    Output('metascore-histogram', 'figure'),
+    Output('directors-films-bar', 'figure'),
+    Output('genre-distribution-pie', 'figure'),
+    Input('compare-movies-dropdown', 'value'),
+    State('genre-dropdown', 'value')
+)
+def update_comparison(selected_movies, genre):
+    dataset = data_source.get(genre)
+    movies = dataset.lookup_movies(selected_movies) if dataset is not None else []
+    return (
+        overview_analysis(dataset, movies),
+        ratings_histogram(dataset, movies),
+        reviews_analysis(dataset, movies),
+        metascore_histogram(dataset, movies),
+        directors_films_bar(dataset, movies),
+        genre_distribution_pie(dataset, movies)
+    )
+
+# Review sentiment and the plot word cloud are sent separately so the summary figures are not held up by them
+@app.callback(
+    Output('sentiment-analysis', 'figure'),
+    Output('sentiment-analysis-categories', 'figure'),
+    Output('film-plot-wordcloud', 'src'),
+    Input('compare-movies-dropdown', 'value'),
+    State('genre-dropdown', 'value')
+)
+def update_comparison_reviews(selected_movies, genre):
+    dataset = data_source.get(genre)
+    movies = dataset.lookup_movies(selected_movies) if dataset is not None else []
+    return (
+        sentiment_analysis(dataset, movies),
+        sentiment_analysis_categories(dataset, movies),
+        film_plot_wordcloud(dataset, movies)
+    )
+
+@app.callback(
+    Output('catalog-ratings', 'figure'),
+    Output('catalog-metascores', 'figure'),
+    Output('catalog-year-trends', 'figure'),
+    Output('catalog-directors', 'figure'),
+    Output('catalog-categories', 'figure'),
+    Output('catalog-review-percentiles', 'figure'),
+    Input('genre-dropdown', 'value')
+)
+def update_catalog_overview(genre):
+    dataset = data_source.get(genre)
+    if dataset is None:
+        return {}, {}, {}, {}, {}, {}
+
+    aggregates = catalog_aggregates(dataset)
+    return (
+        distribution_bar(aggregates['ratings'], 'Rating Distribution', 'Rating'),
+        distribution_bar(aggregates['metascores'], 'Metascore Distribution', 'Metascore'),
+        year_trends_figure(aggregates['years']),
+        director_stats_figure(aggregates['directors']),
+        category_stats_figure(aggregates['categories']),
+        review_percentiles_figure(aggregates['review_percentiles'])
+    )
+
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -1,8 +1,82 @@
-from flask import Flask, request, jsonify, render_template
-from scrape_data import parse_url, get_movie_name_and_links, get_movie_info
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
+from jobs import DONE, FAILED, JobError, JobQueue
+from metrics import PROMETHEUS_CONTENT_TYPE, metrics
+from result_cache import ResultCache, SQLiteResultBackend
+from scrape_data import POSTER_WORKERS, parse_url, search_url, get_imdb_id, get_movie_name_and_links, get_movie_info, resolve_movie_image
+
+DETAILS_WORKERS = 8
+MAX_DETAILS_BATCH = 100
+MOVIES_WAIT = 2.0
+EVENTS_KEEPALIVE = 15
+
+MOVIES_CACHE_TTL = float(os.environ.get('IMDB_MOVIES_CACHE_TTL', 15 * 60))
+DETAILS_CACHE_TTL = float(os.environ.get('IMDB_DETAILS_CACHE_TTL', 60 * 60))
+# Point every worker process at the same SQLite file to share results between them
+RESULT_CACHE_PATH = os.environ.get('IMDB_RESULT_CACHE', '')
 
 app = Flask(__name__)
 
+# Shared by every request so concurrent batches cannot multiply the load on IMDb
+details_executor = ThreadPoolExecutor(max_workers=DETAILS_WORKERS, thread_name_prefix='movie-details')
+
+result_backend = SQLiteResultBackend(RESULT_CACHE_PATH) if RESULT_CACHE_PATH else None
+movies_cache = ResultCache('movies', MOVIES_CACHE_TTL, backend=result_backend)
+details_cache = ResultCache('movie-details', DETAILS_CACHE_TTL, backend=result_backend)
+
+def cached_movie_info(link):
+    # Keyed by IMDb id so the same title reached through different ref_ links is fetched once
+    return details_cache.get_or_compute(get_imdb_id(link) or link, lambda: get_movie_info(link))
+
+# Genre scrapes run as background jobs on a small local pool
+job_queue = JobQueue()
+
+def scrape_genre_movies(job, genre):
+    job.start_stage('search')
+    doc = parse_url(search_url(genre))
+
+    if not doc:
+        raise JobError('Failed to fetch data from IMDb', 500)
+
+    name_link_list = get_movie_name_and_links(doc, with_images=False)
+
+    if not name_link_list:
+        raise JobError('No movies found for the specified genre', 404)
+
+    job.start_stage('posters', len(name_link_list))
+
+    def resolve(item):
+        image_url = resolve_movie_image(get_imdb_id(item['link']))
+        job.advance()
+        return image_url
+
+    with ThreadPoolExecutor(max_workers=POSTER_WORKERS) as executor:
+        image_urls = list(executor.map(resolve, name_link_list))
+
+    data_list = [{'movie': item['movie'], 'link': item['link'], 'ImageUrl': image_url} for item, image_url in zip(name_link_list, image_urls)]
+    movies_cache.set(genre, data_list)
+    return data_list
+
+def submit_genre_job(genre):
+    genre = genre.strip().lower()
+    return job_queue.submit(('movies', genre), scrape_genre_movies, genre)
+
+def job_response(job):
+    snapshot = job.snapshot()
+    snapshot['status_url'] = f"/jobs/{job.id}"
+    snapshot['events_url'] = f"/jobs/{job.id}/events"
+    snapshot['result_url'] = f"/jobs/{job.id}/result"
+    return jsonify(snapshot), 202
+
+def job_result(job):
+    if job.status == DONE:
+        return jsonify(job.result)
+    if job.status == FAILED:
+        return jsonify({'error': job.error}), job.error_status or 500
+    return job_response(job)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -13,19 +87,68 @@ def movies():
     if not genre:
         return jsonify({'error': 'Genre parameter is required'}), 400
 
-    url = f"https://www.imdb.com/search/title/?genres={genre}&title_type=feature"
-    doc = parse_url(url)
+    data_list = movies_cache.get(genre.strip().lower())
+    if data_list is not None:
+        return jsonify(data_list)
 
-    if not doc:
-        return jsonify({'error': 'Failed to fetch data from IMDb'}), 500
+    # Short scrapes answer directly; longer ones return 202 with the job to follow
+    job = submit_genre_job(genre)
+    job.wait(MOVIES_WAIT)
+    return job_result(job)
 
-    name_link_list = get_movie_name_and_links(doc)
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify({cache.namespace: cache.summary() for cache in (movies_cache, details_cache)})
 
-    if not name_link_list:
-        return jsonify({'error': 'No movies found for the specified genre'}), 404
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.to_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    genre = request.form.get('genre')
+    if not genre:
+        return jsonify({'error': 'Genre parameter is required'}), 400
+
+    return job_response(submit_genre_job(genre))
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify(job.snapshot())
 
-    data_list = [{'movie': item['movie'], 'link': item['link'], 'ImageUrl': item['ImageUrl']} for item in name_link_list]
-    return jsonify(data_list)
+@app.route('/jobs/<job_id>/result')
+def get_job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return job_result(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def generate():
+        # Server-sent events: one progress event per change, a comment as keep-alive, and a final done/failed event
+        version = None
+        while True:
+            snapshot, current = job.wait_for_change(version, EVENTS_KEEPALIVE)
+            if current == version:
+                yield ': keep-alive\n\n'
+                continue
+            version = current
+            event = snapshot['status'] if snapshot['status'] in (DONE, FAILED) else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(snapshot)}\n\n"
+            if event != 'progress':
+                return
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 @app.route('/movie-details', methods=['POST'])
 def movie_details():
@@ -33,11 +156,45 @@ def movie_details():
     if not link:
         return jsonify({'error': 'Movie link parameter is required'}), 400
 
-    movie_info = get_movie_info(link)
+    movie_info = cached_movie_info(link)
     if not movie_info:
         return jsonify({'error': 'Failed to fetch movie details'}), 500
 
     return jsonify(movie_info)
 
+@app.route('/movie-details/batch', methods=['POST'])
+def movie_details_batch():
+    links = request.form.getlist('link')
+    if not links and request.is_json:
+        links = (request.get_json(silent=True) or {}).get('links') or []
+    links = list(dict.fromkeys(link for link in links if isinstance(link, str) and link))
+    if not links:
+        return jsonify({'error': 'Movie link parameter is required'}), 400
+    if len(links) > MAX_DETAILS_BATCH:
+        return jsonify({'error': f'At most {MAX_DETAILS_BATCH} movie links are allowed per request'}), 400
+
+    futures = {details_executor.submit(cached_movie_info, link): link for link in links}
+
+    def generate():
+        # One JSON object per line, in completion order, so the page can use each title as soon as it arrives
+        try:
+            for future in as_completed(futures):
+                link = futures[future]
+                try:
+                    movie_info = future.result()
+                except Exception as e:
+                    print(f"Error fetching movie details for {link}: {e}")
+                    movie_info = None
+                if movie_info:
+                    yield json.dumps({'link': link, 'details': movie_info}) + '\n'
+                else:
+                    yield json.dumps({'link': link, 'error': 'Failed to fetch movie details'}) + '\n'
+        finally:
+            # A client that disconnects early leaves no queued fetches behind
+            for future in futures:
+                future.cancel()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import scrape_data
+import title_parser
+from scrape_data import BASE_URL, parse_url, get_movie_info, get_movie_name_and_links, get_user_reviews
+from title_parser import EXTRACTION_MODES, available_parser_backends, parse_html, extract_movie_info, extract_user_reviews
+from embedded_data import extract_embedded_fields
+from parser_parity import TITLE_EXTRACTORS
+from replay import FIXTURE_DIR
+
+BASELINE_PATH = '.benchmarks/baseline.json'
+REPEAT = 10
+TOLERANCE = 0.25
+
+
+def timed(func, repeat):
+    # Median of several runs after one warm-up run, so a single slow run doesn't look like a regression
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def quietly(func):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return run
+
+
+def run_benchmark(fixtures, kind, scraper, extractors, repeat):
+    keys = fixtures.urls(kind)
+    if not keys:
+        return None
+
+    def scrape_all():
+        for key in keys:
+            scraper(key)
+
+    replayed = fixtures.stats['replayed']
+    quietly(scrape_all)()
+    pages = fixtures.stats['replayed'] - replayed
+
+    seconds = timed(quietly(scrape_all), repeat)
+    result = {
+        'fixtures': len(keys),
+        'pages': pages,
+        'seconds': seconds,
+        'pages_per_sec': pages / seconds if seconds else None,
+        'peak_memory_bytes': peak_memory(quietly(scrape_all)),
+        'extractors': {}
+    }
+
+    # Each stage on its own: building the DOM, then every extractor against the already-built DOM
+    pages = [fixtures.read(key) for key in keys]
+    docs = [parse_html(content, 'utf-8') for content in pages]
+    stages = {'parse_html': lambda: [parse_html(content, 'utf-8') for content in pages]}
+    for name, extractor in extractors.items():
+        source = pages if name == 'extract_embedded_fields' else docs
+        stages[name] = lambda extractor=extractor, source=source: [extractor(item) for item in source]
+    for name, stage in stages.items():
+        result['extractors'][name] = timed(quietly(stage), repeat)
+    return result
+
+
+def run_benchmarks(fixtures, repeat=REPEAT):
+    title_extractors = {'extract_embedded_fields': extract_embedded_fields}
+    title_extractors.update((extractor.__name__, extractor) for extractor in TITLE_EXTRACTORS)
+    title_extractors['extract_movie_info'] = lambda doc: extract_movie_info(doc, '', [])
+
+    benchmarks = {
+        'get_movie_info': ('title', get_movie_info, title_extractors),
+        'get_movie_name_and_links': (
+            'search',
+            lambda key: get_movie_name_and_links(parse_url(f"{BASE_URL}{key}"), with_images=False),
+            {'get_movie_name_and_links': lambda doc: get_movie_name_and_links(doc, with_images=False)}
+        ),
+        'get_user_reviews': (
+            'reviews',
+            lambda key: get_user_reviews(key.split('reviews')[0]),
+            {'extract_user_reviews': extract_user_reviews}
+        )
+    }
+    results = {}
+    for name, (kind, scraper, extractors) in benchmarks.items():
+        result = run_benchmark(fixtures, kind, scraper, extractors, repeat)
+        if result is None:
+            print(f"Skipping {name}: no '{kind}' pages in {fixtures.directory} (capture some with scrape_data.py --record)")
+            continue
+        results[name] = result
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        timings = [(name, result['seconds'], previous['seconds'])]
+        timings += [
+            (f"{name}/{stage}", seconds, previous['extractors'][stage])
+            for stage, seconds in result['extractors'].items() if stage in previous['extractors']
+        ]
+        for label, seconds, before in timings:
+            if before and seconds > before * (1 + tolerance):
+                regressions.append((label, before, seconds))
+    return regressions
+
+
+def print_results(results):
+    for name, result in results.items():
+        print(f"{name}: {result['pages']} pages from {result['fixtures']} fixtures in {result['seconds'] * 1000:.1f} ms "
+              f"({result['pages_per_sec']:.1f} pages/sec, peak memory {result['peak_memory_bytes'] / 1024 / 1024:.1f} MiB)")
+        for stage, seconds in result['extractors'].items():
+            print(f"    {stage:<32} {seconds * 1000:9.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper's extractors against saved pages, without touching the network")
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help="fixture directory with a manifest.json")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="timed runs per benchmark (the median is reported)")
+    parser.add_argument('--parser', choices=available_parser_backends(), default=title_parser.PARSER_BACKEND, help="BeautifulSoup parser backend")
+    parser.add_argument('--extraction', choices=EXTRACTION_MODES, default=title_parser.EXTRACTION_MODE, help="title extraction mode used by get_movie_info")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="results file to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="fraction a timing may grow over the baseline before it counts as a regression")
+    args = parser.parse_args(argv)
+
+    title_parser.set_parser_backend(args.parser)
+    title_parser.set_extraction_mode(args.extraction)
+    scrape_data.configure_cache(None)
+    scrape_data.configure_rate_limiter(0)
+    fixtures = scrape_data.configure_fixtures(args.fixtures)
+
+    print(f"Benchmarking {len(fixtures.pages)} fixtures from {args.fixtures} ({args.parser}, {args.extraction} extraction, median of {args.repeat})")
+    results = run_benchmarks(fixtures, args.repeat)
+    print_results(results)
+    settings = {'parser': args.parser, 'extraction': args.extraction}
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump({'settings': settings, 'results': results}, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    if baseline['settings'] != settings:
+        print(f"Baseline was recorded with {baseline['settings']}, not {settings}; skipping the comparison")
+        return 0
+
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for label, before, after in regressions:
+        print(f"REGRESSION {label}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({after / before - 1:+.0%})")
+    if regressions:
+        print(f"{len(regressions)} timing(s) are more than {args.tolerance:.0%} slower than the baseline")
+        return 1
+    print(f"No timing is more than {args.tolerance:.0%} slower than the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import threading
+import time
+
+DONE = 'done'
+FAILED = 'failed'
+MAX_ATTEMPTS = 3
+
+
+class CrawlCheckpoint:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS titles (
+                genre TEXT NOT NULL,
+                title_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (genre, title_id)
+            )
+        ''')
+        self._db.commit()
+
+    def completed(self, genre):
+        with self._lock:
+            rows = self._db.execute('SELECT title_id FROM titles WHERE genre = ? AND status = ?', (genre, DONE)).fetchall()
+        return {title_id for (title_id,) in rows}
+
+    def failed(self, genre):
+        with self._lock:
+            rows = self._db.execute('SELECT title_id FROM titles WHERE genre = ? AND status = ?', (genre, FAILED)).fetchall()
+        return {title_id for (title_id,) in rows}
+
+    def exhausted(self, genre, max_attempts):
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT title_id FROM titles WHERE genre = ? AND status = ? AND attempts >= ?', (genre, FAILED, max_attempts)
+            ).fetchall()
+        return {title_id for (title_id,) in rows}
+
+    def reconcile(self, genre, recorded):
+        # A title is written to the output log before it is marked done, so a run that stops in between leaves a
+        # record without its checkpoint; titles marked done whose record is missing go back to not being attempted
+        done = self.completed(genre)
+        with self._lock:
+            self._db.executemany('DELETE FROM titles WHERE genre = ? AND title_id = ?', [(genre, title_id) for title_id in done - recorded])
+            self._db.executemany('''
+                INSERT INTO titles (genre, title_id, status, attempts, updated_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT (genre, title_id) DO UPDATE SET status = excluded.status, error = NULL, updated_at = excluded.updated_at
+            ''', [(genre, title_id, DONE, time.time()) for title_id in recorded - done])
+            self._db.commit()
+
+    def _mark(self, genre, title_id, status, error=None):
+        with self._lock:
+            self._db.execute('''
+                INSERT INTO titles (genre, title_id, status, attempts, error, updated_at) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT (genre, title_id) DO UPDATE SET
+                    status = excluded.status, attempts = attempts + 1, error = excluded.error, updated_at = excluded.updated_at
+            ''', (genre, title_id, status, error, time.time()))
+            self._db.commit()
+
+    def mark_done(self, genre, title_id):
+        self._mark(genre, title_id, DONE)
+
+    def mark_failed(self, genre, title_id, error):
+        self._mark(genre, title_id, FAILED, str(error))
+
+    def reset(self, genre):
+        with self._lock:
+            self._db.execute('DELETE FROM titles WHERE genre = ?', (genre,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
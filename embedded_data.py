@@ -0,0 +1,196 @@
+import html
+import json
+import re
+from datetime import date
+
+NEXT_DATA_PATTERN = re.compile(rb'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+LD_JSON_PATTERN = re.compile(rb'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>', re.S)
+ISO_DURATION_PATTERN = re.compile(r'PT(?:(\d+)H)?(?:(\d+)M)?')
+
+TITLE_FIELDS = (
+    'movie_name', 'YearDuration', 'Ratings', 'ReviewRelatedInfo', 'FilmPlot',
+    'Directors', 'Writers', 'Stars', 'Details', 'BoxOfficeDetails'
+)
+
+
+def load_script_json(content, pattern):
+    match = pattern.search(content)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError as e:
+        print(f"Error decoding embedded JSON: {e}")
+    return None
+
+
+def dig(data, *keys):
+    for key in keys:
+        if isinstance(data, dict):
+            data = data.get(key)
+        elif isinstance(data, list) and isinstance(key, int) and -len(data) <= key < len(data):
+            data = data[key]
+        else:
+            return None
+    return data
+
+
+def format_money(money):
+    if not money or money.get('currency') != 'USD' or money.get('amount') is None:
+        return None
+    return f"${money['amount']:,}"
+
+
+def format_runtime(seconds):
+    hours, minutes = divmod(int(seconds) // 60, 60)
+    if hours and minutes:
+        return f"{hours}h {minutes}m"
+    return f"{hours}h" if hours else f"{minutes}m"
+
+
+def format_release_date(release_date):
+    try:
+        day = date(release_date['year'], release_date['month'], release_date['day'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    # Built from the parts rather than strftime's %-d, which only glibc understands
+    text = f"{day:%B} {day.day}, {day.year}"
+    country = dig(release_date, 'country', 'text')
+    return f"{text} ({country})" if country else text
+
+
+def format_weekend_date(value):
+    try:
+        day = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return f"{day:%b} {day.day}, {day.year}"
+
+
+def format_rating(value):
+    # ld+json may carry ratingValue as a string
+    try:
+        return [f"{float(value):.1f}", '/', '10']
+    except (TypeError, ValueError):
+        return None
+
+
+def credit_names(credit_groups, category_id):
+    for group in credit_groups or []:
+        if dig(group, 'category', 'id') == category_id:
+            return [dig(credit, 'name', 'nameText', 'text') for credit in group.get('credits') or [] if dig(credit, 'name', 'nameText', 'text')]
+    return None
+
+
+def fields_from_next_data(next_data):
+    above = dig(next_data, 'props', 'pageProps', 'aboveTheFoldData') or {}
+    main = dig(next_data, 'props', 'pageProps', 'mainColumnData') or {}
+    fields = {}
+
+    name = dig(above, 'titleText', 'text')
+    if name:
+        fields['movie_name'] = name
+
+    year = dig(above, 'releaseYear', 'year')
+    runtime = dig(above, 'runtime', 'displayableProperty', 'value', 'plainText')
+    if year and runtime:
+        certificate = dig(above, 'certificate', 'rating')
+        fields['YearDuration'] = [str(year)] + ([certificate] if certificate else []) + [runtime]
+
+    ratings = format_rating(dig(above, 'ratingsSummary', 'aggregateRating'))
+    if ratings:
+        fields['Ratings'] = ratings
+
+    user_reviews = dig(above, 'reviews', 'total')
+    critic_reviews = dig(above, 'criticReviewsTotal', 'total')
+    if user_reviews is not None and critic_reviews is not None:
+        review_info = [{'User reviews': str(user_reviews)}, {'Critic reviews': str(critic_reviews)}]
+        metascore = dig(above, 'metacritic', 'metascore', 'score')
+        if metascore is not None:
+            review_info.append({'Metascore': str(metascore)})
+        fields['ReviewRelatedInfo'] = review_info
+
+    plot = dig(above, 'plot', 'plotText', 'plainText')
+    if plot:
+        fields['FilmPlot'] = plot
+
+    credits = above.get('principalCredits')
+    for field, category_id in (('Directors', 'director'), ('Writers', 'writer'), ('Stars', 'cast')):
+        names = credit_names(credits, category_id)
+        if names is not None:
+            fields[field] = names
+
+    release_date = format_release_date(main.get('releaseDate') or {})
+    country = dig(main, 'countriesOfOrigin', 'countries', 0, 'text')
+    language = dig(main, 'spokenLanguages', 'spokenLanguages', 0, 'text')
+    if 'releaseDate' in main and 'countriesOfOrigin' in main and 'spokenLanguages' in main:
+        fields['Details'] = {
+            'Release-Date': release_date or 'N/A',
+            'Country-Origin': country or 'N/A',
+            'Language': language or 'N/A'
+        }
+
+    box_office_keys = ('productionBudget', 'lifetimeGross', 'openingWeekendGross', 'worldwideGross')
+    if all(key in main for key in box_office_keys):
+        fields['BoxOfficeDetails'] = box_office_from_next_data(main)
+    return fields
+
+
+def box_office_from_next_data(main):
+    budget = main.get('productionBudget')
+    gross = format_money(dig(main, 'lifetimeGross', 'total'))
+    weekend = format_money(dig(main, 'openingWeekendGross', 'gross', 'total'))
+    worldwide = format_money(dig(main, 'worldwideGross', 'total'))
+
+    data = {}
+    if budget or gross or weekend or worldwide:
+        money = format_money(dig(budget, 'budget'))
+        data['Budget'] = f"{money} (estimated)" if money else 'N/A'
+    if gross:
+        data['Gross US & Canada'] = gross
+    if weekend:
+        data['Opening weekend US & Canada'] = {
+            'Collection': weekend,
+            'Date': format_weekend_date(dig(main, 'openingWeekendGross', 'weekendEndDate')) or 'N/A'
+        }
+    if worldwide:
+        data['Gross worldwide'] = worldwide
+    return data
+
+
+def person_names(people):
+    if isinstance(people, dict):
+        people = [people]
+    return [html.unescape(person['name']) for person in people or [] if person.get('@type') == 'Person' and person.get('name')]
+
+
+def fields_from_ld_json(ld):
+    fields = {}
+    if ld.get('name'):
+        fields['movie_name'] = html.unescape(ld['name'])
+
+    duration = ISO_DURATION_PATTERN.fullmatch(ld.get('duration') or '')
+    if ld.get('datePublished') and duration:
+        runtime = format_runtime(int(duration.group(1) or 0) * 3600 + int(duration.group(2) or 0) * 60)
+        certificate = ld.get('contentRating')
+        fields['YearDuration'] = [ld['datePublished'][:4]] + ([certificate] if certificate else []) + [runtime]
+
+    ratings = format_rating(dig(ld, 'aggregateRating', 'ratingValue'))
+    if ratings:
+        fields['Ratings'] = ratings
+
+    for field, key in (('Directors', 'director'), ('Writers', 'creator'), ('Stars', 'actor')):
+        if key in ld:
+            fields[field] = person_names(ld[key])
+    return fields
+
+
+def extract_embedded_fields(content):
+    fields = {}
+    ld = load_script_json(content, LD_JSON_PATTERN)
+    if isinstance(ld, dict):
+        fields.update(fields_from_ld_json(ld))
+    next_data = load_script_json(content, NEXT_DATA_PATTERN)
+    if isinstance(next_data, dict):
+        fields.update(fields_from_next_data(next_data))
+    return fields
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DAY = 24 * 60 * 60
+
+DEFAULT_TTLS = {
+    'title': DAY,
+    'reviews': DAY / 2,
+    'mediaviewer': 30 * DAY,
+    'search': 60 * 60,
+    'other': 60 * 60
+}
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Query parameters that only track navigation and never change the page content
+IGNORED_PARAMS = {'ref_'}
+
+
+def normalize_url(url):
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+    path = parts.path or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def page_type(url):
+    path = urlsplit(url).path
+    if path.startswith('/search/'):
+        return 'search'
+    if path.startswith('/title/'):
+        if '/reviews' in path:
+            return 'reviews'
+        if '/mediaviewer' in path:
+            return 'mediaviewer'
+        return 'title'
+    return 'other'
+
+
+def build_response(url, status_code, headers, content):
+    response = requests.models.Response()
+    response.url = url
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    response.reason = 'OK'
+    return response
+
+
+class ResponseCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                page_type TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._db.commit()
+        # Running size of all stored bodies, so a store doesn't have to sum the whole table
+        self._total_bytes = self._stored_bytes()
+
+    def _stored_bytes(self):
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def key(self, url):
+        return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+
+    def lookup(self, url):
+        key = self.key(url)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT page_type, headers, body, fetched_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self._db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+
+        kind, headers, body, fetched_at = row
+        entry = {
+            'headers': json.loads(headers),
+            'content': zlib.decompress(body),
+            'fresh': time.time() - fetched_at < self.ttls.get(kind, self.ttls['other'])
+        }
+        with self._lock:
+            self.stats['hits' if entry['fresh'] else 'misses'] += 1
+        return entry
+
+    def validators(self, entry):
+        headers = {}
+        if entry and entry['headers'].get('ETag'):
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if entry and entry['headers'].get('Last-Modified'):
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def revalidated(self, url):
+        now = time.time()
+        with self._lock:
+            self._db.execute('UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?', (now, now, self.key(url)))
+            self._db.commit()
+            self.stats['revalidated'] += 1
+
+    def store(self, url, response):
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        body = zlib.compress(response.content, 6)
+        now = time.time()
+        key = self.key(url)
+        with self._lock:
+            replaced = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, normalize_url(url), page_type(url), json.dumps(headers), body, len(body), now, now)
+            )
+            self._total_bytes += len(body) - (replaced[0] if replaced else 0)
+            self.stats['stores'] += 1
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Another process may share the file, so the running total is re-read before anything is deleted
+        self._total_bytes = self._stored_bytes()
+        while self._total_bytes > self.max_bytes:
+            oldest = self._db.execute('SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64').fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.stats['evictions'] += 1
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def response(self, url, entry):
+        return build_response(url, 200, entry['headers'], entry['content'])
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,135 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+JOB_WORKERS = 2
+JOB_TTL = 10 * 60
+
+
+class JobError(Exception):
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+
+class Job:
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = QUEUED
+        self.stage = None
+        self.completed = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.error_status = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._version = 0
+        self._changed = threading.Condition()
+
+    def _update(self, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self._version += 1
+            self._changed.notify_all()
+
+    def start_stage(self, stage, total=None):
+        self._update(stage=stage, completed=0, total=total)
+
+    def advance(self, count=1):
+        with self._changed:
+            self.completed += count
+            self._version += 1
+            self._changed.notify_all()
+
+    def snapshot(self):
+        with self._changed:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'stage': self.stage,
+                'completed': self.completed,
+                'total': self.total,
+                'error': self.error,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while self.status not in FINISHED:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    def wait_for_change(self, version, timeout=None):
+        # Returns the job's snapshot and version once it differs from the version the caller last saw
+        with self._changed:
+            if self._version == version:
+                self._changed.wait(timeout)
+            return self.snapshot(), self._version
+
+
+class JobQueue:
+    def __init__(self, workers=JOB_WORKERS, ttl=JOB_TTL):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args):
+        # Requests for the same key while a job is queued or running share that job
+        with self._lock:
+            self._expire()
+            job = self._active.get(key)
+            if job is not None:
+                return job
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        self._executor.submit(self._run, job, func, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, func, args):
+        job._update(status=RUNNING)
+        try:
+            result = func(job, *args)
+        except JobError as e:
+            self._finish(job, status=FAILED, error=str(e), error_status=e.status)
+        except Exception as e:
+            print(f"Job {job.id} ({job.key}) failed: {e}")
+            self._finish(job, status=FAILED, error=str(e), error_status=500)
+        else:
+            self._finish(job, status=DONE, result=result)
+
+    def _finish(self, job, **changes):
+        with self._lock:
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+        job._update(finished_at=time.time(), **changes)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,109 @@
+import threading
+import time
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = 'imdb_scraper'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+# Process-wide counters and timing spans, keyed by metric name plus a set of labels
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.timings = {}
+
+    def increment(self, name, value=1, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            count, total, longest = self.timings.get(key, (0, 0.0, 0.0))
+            self.timings[key] = (count + 1, total + seconds, max(longest, seconds))
+
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return {'counters': dict(self.counters), 'timings': dict(self.timings)}
+
+    def merge(self, snapshot):
+        # Folds in what another process recorded, e.g. a parse worker
+        with self._lock:
+            for key, value in snapshot['counters'].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (count, total, longest) in snapshot['timings'].items():
+                seen_count, seen_total, seen_longest = self.timings.get(key, (0, 0.0, 0.0))
+                self.timings[key] = (seen_count + count, seen_total + total, max(seen_longest, longest))
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+    def summary(self):
+        snapshot = self.snapshot()
+        counters = {}
+        for (name, labels), value in sorted(snapshot['counters'].items()):
+            counters.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        timings = {}
+        for (name, labels), (count, total, longest) in sorted(snapshot['timings'].items()):
+            timings.setdefault(name, []).append({
+                'labels': dict(labels),
+                'count': count,
+                'total_seconds': round(total, 6),
+                'mean_seconds': round(total / count, 6),
+                'max_seconds': round(longest, 6)
+            })
+        return {'counters': counters, 'timings': timings}
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        snapshot = self.snapshot()
+        lines = []
+        counters = {}
+        for (name, labels), value in snapshot['counters'].items():
+            counters.setdefault(name, []).append((labels, value))
+        for name, samples in sorted(counters.items()):
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f"{metric}{format_labels(labels)} {value}" for labels, value in sorted(samples))
+
+        # Spans are exported as summaries without quantiles, plus the slowest observation as a gauge
+        timings = {}
+        for (name, labels), values in snapshot['timings'].items():
+            timings.setdefault(name, []).append((labels, values))
+        for name, samples in sorted(timings.items()):
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for labels, (count, total, _) in sorted(samples):
+                lines.append(f"{metric}_count{format_labels(labels)} {count}")
+                lines.append(f"{metric}_sum{format_labels(labels)} {total:.6f}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            lines.extend(f"{metric}_max{format_labels(labels)} {longest:.6f}" for labels, (_, _, longest) in sorted(samples))
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
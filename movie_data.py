@@ -0,0 +1,302 @@
+import os
+import re
+import threading
+from collections import Counter
+
+import pandas as pd
+
+from aggregates import catalog_aggregates
+from embedded_data import format_runtime
+from movie_search import SEARCH_LIMIT, MovieSearchIndex
+from movie_store import (
+    STORE_DIR, STORE_TABLES, backfill_sentiment, build_tables, read_appended_records, records_from_csv, records_from_json,
+    store_exists, store_is_current, store_path, write_movie_store
+)
+from sentiment import cached_polarity
+
+CSV_DIR = 'csv_files'
+JSON_DIR = 'data_collect'
+POLL_INTERVAL = 5.0
+LOG_HEAD_BYTES = 256
+
+# (directory, file name pattern) for each kind of scraper output; ties on mtime go to the earlier entry
+SOURCE_PATTERNS = (
+    (JSON_DIR, re.compile(r'^movie_category-(.+)\.jsonl$')),
+    (JSON_DIR, re.compile(r'^movie_category-(.+)\.json$')),
+    (CSV_DIR, re.compile(r'^movies_data-(.+)\.csv$'))
+)
+
+
+def extract_movie_data(tables):
+    movies_data = []
+    directors_films = {}
+    genres_data = Counter()
+
+    reviews_by_movie = {title_id: group.sort_values('position') for title_id, group in tables['reviews'].groupby('title_id', observed=True)}
+    people = tables['people'][tables['people']['role'] == 'director'].sort_values(['title_id', 'position'])
+    directors_by_movie = people.groupby('title_id', observed=True)['name'].apply(list).to_dict()
+
+    for movie in tables['movies'].itertuples(index=False):
+        reviews = reviews_by_movie.get(movie.title_id)
+        movie_data = {
+            "movie_name": movie.movie_name or "",
+            "movie_imdb_id": movie.title_id,
+            "publish_year": str(movie.year) if not pd.isna(movie.year) else "",
+            "movie_category": movie.certificate if not pd.isna(movie.certificate) else "",
+            "duration": format_runtime(movie.duration_minutes * 60) if not pd.isna(movie.duration_minutes) else "",
+            "rating": float(movie.rating) if not pd.isna(movie.rating) else 0.0,
+            "user_reviews": int(movie.user_reviews) if not pd.isna(movie.user_reviews) else 0,
+            "critic_reviews": int(movie.critic_reviews) if not pd.isna(movie.critic_reviews) else 0,
+            "metascore": int(movie.metascore) if not pd.isna(movie.metascore) else 0,
+            "film_plot": movie.film_plot or "",
+            "user_reviews_data": [
+                {
+                    "Rating": str(review.rating) if not pd.isna(review.rating) else "",
+                    "Title": review.title,
+                    "Content": review.content,
+                    "Sentiment": float(review.sentiment) if not pd.isna(review.sentiment) else cached_polarity(review.content)
+                }
+                for review in reviews.itertuples(index=False)
+            ] if reviews is not None else [],
+            "directors": directors_by_movie.get(movie.title_id, [])
+        }
+
+        for director_name in movie_data["directors"]:
+            if director_name not in directors_films:
+                directors_films[director_name] = []
+            directors_films[director_name].append(movie_data["movie_name"])
+
+        genres_data[movie_data["movie_category"]] += 1
+
+        movies_data.append(movie_data)
+
+    return movies_data, directors_films, genres_data
+
+
+def extract_term_frequencies(tables):
+    frequencies = {}
+    for (title_id, source), group in tables['terms'].groupby(['title_id', 'source'], observed=True):
+        frequencies[(title_id, source)] = dict(zip(group['term'], group['count'].astype(int)))
+    return frequencies
+
+
+def read_log_head(file_path):
+    with open(file_path, 'rb') as file:
+        return file.read(LOG_HEAD_BYTES)
+
+
+class MovieDataset:
+    def __init__(self, genre, tables, signature, previous=None, added=None):
+        self.genre = genre
+        self.tables = tables
+        self.signature = signature
+        self.version = max((mtime for _, mtime, _ in signature), default=0) // 1000000
+        if previous is None:
+            self.movies_data, self.directors_films, self.genres_data = extract_movie_data(tables)
+            self.term_frequencies = extract_term_frequencies(tables)
+        else:
+            # Only the appended rows are converted; everything else is carried over from the dataset being extended
+            movies_data, directors_films, genres_data = extract_movie_data(added)
+            self.movies_data = previous.movies_data + movies_data
+            self.directors_films = {name: list(films) for name, films in previous.directors_films.items()}
+            for name, films in directors_films.items():
+                self.directors_films.setdefault(name, []).extend(films)
+            self.genres_data = previous.genres_data + genres_data
+            self.term_frequencies = {**previous.term_frequencies, **extract_term_frequencies(added)}
+        self.movies_by_id = {}
+        self.movies_by_name = {}
+        for movie in self.movies_data:
+            self.movies_by_id[movie['movie_imdb_id']] = movie
+            self.movies_by_name.setdefault(movie['movie_name'], []).append(movie)
+        self.search_index = MovieSearchIndex(self.movies_data)
+        self.aggregates = None
+
+    def extended(self, added, signature):
+        tables = {
+            name: pd.concat([self.tables[name], table], ignore_index=True).astype(STORE_TABLES[name])
+            for name, table in added.items()
+        }
+        return MovieDataset(self.genre, tables, signature, self, added)
+
+    def movie_label(self, movie):
+        # Titles sharing a name are told apart by their year
+        if len(self.movies_by_name.get(movie['movie_name'], [])) > 1 and movie['publish_year']:
+            return f"{movie['movie_name']} ({movie['publish_year']})"
+        return movie['movie_name']
+
+    def movie_option(self, movie, search_value=''):
+        # Matches may be on a director or a corrected typo, so the typed text is added to the option's
+        # search string to keep the dropdown's own client-side filter from hiding them
+        search = ' '.join([movie['movie_name']] + movie['directors'] + ([search_value] if search_value else []))
+        return {'label': self.movie_label(movie), 'value': movie['movie_imdb_id'], 'search': search}
+
+    def search_options(self, search_value, selected=None, limit=SEARCH_LIMIT):
+        # Only the current selection and the best matches are sent, whatever the catalog size
+        movies = self.lookup_movies(selected)
+        seen = {movie['movie_imdb_id'] for movie in movies}
+        options = [self.movie_option(movie) for movie in movies]
+        for movie in self.search_index.search(search_value, limit):
+            if movie['movie_imdb_id'] not in seen:
+                options.append(self.movie_option(movie, search_value))
+        return options
+
+    def lookup_movie(self, key):
+        # Dropdown values are IMDb ids; a bare name resolves to the first title with that name
+        if key in self.movies_by_id:
+            return self.movies_by_id[key]
+        movies = self.movies_by_name.get(key)
+        return movies[0] if movies else None
+
+    def lookup_movies(self, keys):
+        movies = []
+        for key in keys or []:
+            movie = self.lookup_movie(key)
+            if movie is not None:
+                movies.append(movie)
+        return movies
+
+
+class MovieDataSource:
+    def __init__(self, store_dir=STORE_DIR, poll_interval=POLL_INTERVAL):
+        self.store_dir = store_dir
+        self.poll_interval = poll_interval
+        self._datasets = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        # genre -> (JSON Lines log, offset its dataset was read up to, the log's first bytes when it was read)
+        self._log_offsets = {}
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def source_files(self):
+        files = {}
+        for rank, (directory, pattern) in enumerate(SOURCE_PATTERNS):
+            try:
+                names = os.listdir(directory)
+            except FileNotFoundError:
+                continue
+            for name in names:
+                match = pattern.match(name)
+                if match:
+                    stat = os.stat(os.path.join(directory, name))
+                    files.setdefault(match.group(1), []).append((stat.st_mtime_ns, -rank, os.path.join(directory, name), stat.st_size))
+        return files
+
+    def genres(self):
+        genres = set(self.source_files())
+        if os.path.isdir(self.store_dir):
+            genres.update(name for name in os.listdir(self.store_dir) if store_exists(store_path(name, self.store_dir)))
+        return sorted(genres)
+
+    def signature(self, genre, files=None):
+        files = self.source_files() if files is None else files
+        return tuple(sorted((path, mtime, size) for mtime, _, path, size in files.get(genre, [])))
+
+    def _read_source(self, genre, source_file):
+        if source_file.endswith('.jsonl'):
+            # The offset is remembered so that later polls only read what the crawl appends
+            head = read_log_head(source_file)
+            records, offset = read_appended_records(source_file)
+            self._log_offsets[genre] = (source_file, offset, head)
+            return records
+        return records_from_csv(source_file) if source_file.endswith('.csv') else records_from_json(source_file)
+
+    def _read_appended(self, genre, source):
+        # A running crawl only appends to its JSON Lines log, so just the new lines are normalized and scored
+        log = self._log_offsets.get(genre)
+        if source is None or log is None or source[2] != log[0] or source[3] < log[1]:
+            return None
+        source_file, offset, head = log
+        if read_log_head(source_file)[:len(head)] != head:
+            # A new crawl has rewritten the log
+            return None
+        records, offset = read_appended_records(source_file, offset)
+        added = build_tables(records, genre)
+        self._log_offsets[genre] = (source_file, offset, head)
+        return added
+
+    def _load_tables(self, genre, files):
+        path = store_path(genre, self.store_dir)
+        # The newest scraper output wins: a running crawl's JSON Lines log is newer than the last finalized files
+        source = max(files, default=None)
+        self._log_offsets.pop(genre, None)
+
+        if source is not None and not store_is_current(path, source[2]):
+            try:
+                return write_movie_store(self._read_source(genre, source[2]), path, genre)
+            except Exception as e:
+                self._log_offsets.pop(genre, None)
+                print(f"Error building movie store '{path}': {e}")
+
+        if store_exists(path):
+            tables, scored = backfill_sentiment(path)
+            if scored:
+                print(f"Scored sentiment for {scored} reviews in '{path}'")
+            return tables
+        if source is not None:
+            return build_tables(self._read_source(genre, source[2]), genre)
+        print(f"No movie data found for '{genre}'.")
+        return None
+
+    def _load(self, genre):
+        with self._lock:
+            load_lock = self._load_locks.setdefault(genre, threading.Lock())
+
+        # One thread builds a genre while concurrent callers wait for its result
+        with load_lock:
+            files = self.source_files()
+            signature = self.signature(genre, files)
+            current = self._datasets.get(genre)
+            if current is not None and current.signature == signature:
+                return current
+            dataset = None
+            if current is not None:
+                try:
+                    added = self._read_appended(genre, max(files.get(genre, []), default=None))
+                    if added is not None:
+                        dataset = current.extended(added, signature)
+                except Exception as e:
+                    print(f"Error reading new movie data for '{genre}': {e}")
+            if dataset is None:
+                try:
+                    tables = self._load_tables(genre, files.get(genre, []))
+                except Exception as e:
+                    print(f"Error loading movie data for '{genre}': {e}")
+                    tables = None
+                if tables is None:
+                    return current
+                dataset = MovieDataset(genre, tables, signature)
+            # Catalog aggregates are computed before the swap so callbacks never compute them
+            catalog_aggregates(dataset)
+            with self._lock:
+                self._datasets[genre] = dataset
+            return dataset
+
+    def get(self, genre):
+        dataset = self._datasets.get(genre)
+        if dataset is None and genre:
+            dataset = self._load(genre)
+        return dataset
+
+    def refresh(self):
+        # Only genres that were already requested and whose files changed are rebuilt
+        files = self.source_files()
+        for genre, dataset in list(self._datasets.items()):
+            if dataset.signature != self.signature(genre, files):
+                print(f"Reloading movie data for '{genre}'")
+                self._load(genre)
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error reloading movie data: {e}")
+
+    def start(self):
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name='movie-data-watcher', daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,73 @@
+import difflib
+import re
+import unicodedata
+from bisect import bisect_left
+
+SEARCH_LIMIT = 20
+FUZZY_MIN_LENGTH = 3
+FUZZY_CUTOFF = 0.75
+
+# Name tokens outrank director tokens; a whole-word hit outranks a prefix hit and a fuzzy hit ranks last
+NAME_WEIGHT = 2.0
+DIRECTOR_WEIGHT = 1.0
+EXACT_BONUS = 1.0
+FUZZY_PENALTY = 0.5
+
+
+def search_tokens(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return re.sub(r'[^a-z0-9]+', ' ', text).split()
+
+
+class MovieSearchIndex:
+    def __init__(self, movies):
+        self.movies = movies
+        self.postings = {}
+        for i, movie in enumerate(movies):
+            for token in search_tokens(movie['movie_name']):
+                self.postings.setdefault(token, {})[i] = NAME_WEIGHT
+            for director in movie['directors']:
+                for token in search_tokens(director):
+                    self.postings.setdefault(token, {}).setdefault(i, DIRECTOR_WEIGHT)
+        self.tokens = sorted(self.postings)
+        self.popularity = [movie['user_reviews'] for movie in movies]
+        self.popular = sorted(range(len(movies)), key=lambda i: (-self.popularity[i], i))
+
+    def _prefix_matches(self, term):
+        scores = {}
+        for position in range(bisect_left(self.tokens, term), len(self.tokens)):
+            token = self.tokens[position]
+            if not token.startswith(term):
+                break
+            bonus = EXACT_BONUS if token == term else 0.0
+            for i, weight in self.postings[token].items():
+                scores[i] = max(scores.get(i, 0.0), weight + bonus)
+        return scores
+
+    def _fuzzy_matches(self, term):
+        scores = {}
+        if len(term) < FUZZY_MIN_LENGTH:
+            return scores
+        for token in difflib.get_close_matches(term, self.tokens, n=5, cutoff=FUZZY_CUTOFF):
+            for i, weight in self.postings[token].items():
+                scores[i] = max(scores.get(i, 0.0), weight - FUZZY_PENALTY)
+        return scores
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        terms = search_tokens(query)
+        if not terms:
+            return [self.movies[i] for i in self.popular[:limit]]
+
+        # Every term has to match a name or director token; typos fall back to the closest tokens
+        scores = None
+        for term in terms:
+            matches = self._prefix_matches(term) or self._fuzzy_matches(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {i: scores[i] + score for i, score in matches.items() if i in scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], -self.popularity[i], i))
+        return [self.movies[i] for i in ranked[:limit]]
@@ -0,0 +1,363 @@
+import argparse
+import ast
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+
+import pandas as pd
+from wordcloud import WordCloud
+
+from sentiment import score_texts
+
+STORE_DIR = 'parquet_files'
+
+YEAR_PATTERN = re.compile(r'^\d{4}$')
+DURATION_PATTERN = re.compile(r'^(?:(\d+)h)?\s*(?:(\d+)m)?$')
+COUNT_PATTERN = re.compile(r'^([\d.,]+)\s*([KM]?)$', re.I)
+
+PEOPLE_LABELS = {'Director', 'Directors', 'Writer', 'Writers', 'Star', 'Stars'}
+
+NESTED_FIELDS = ('YearDuration', 'Ratings', 'ReviewRelatedInfo', 'UserReviews', 'Directors', 'Writers', 'Stars', 'Details', 'BoxOfficeDetails')
+
+MOVIE_DTYPES = {
+    'title_id': 'string',
+    'movie_name': 'string',
+    'genre': 'category',
+    'year': 'Int16',
+    'certificate': 'category',
+    'duration_minutes': 'Int16',
+    'rating': 'Float64',
+    'user_reviews': 'Int32',
+    'critic_reviews': 'Int32',
+    'metascore': 'Int16',
+    'film_plot': 'string',
+    'release_date': 'string',
+    'country': 'category',
+    'language': 'category',
+    'budget_usd': 'Int64',
+    'gross_us_canada_usd': 'Int64',
+    'gross_worldwide_usd': 'Int64'
+}
+
+REVIEW_DTYPES = {
+    'title_id': 'string',
+    'position': 'Int16',
+    'rating': 'Int8',
+    'title': 'string',
+    'content': 'string',
+    'content_hash': 'string',
+    'sentiment': 'Float64'
+}
+
+PEOPLE_DTYPES = {
+    'title_id': 'string',
+    'role': 'category',
+    'position': 'Int16',
+    'name': 'string'
+}
+
+TERM_DTYPES = {
+    'title_id': 'string',
+    'source': 'category',
+    'term': 'string',
+    'count': 'Int32'
+}
+
+STORE_TABLES = {
+    'movies': MOVIE_DTYPES,
+    'reviews': REVIEW_DTYPES,
+    'people': PEOPLE_DTYPES,
+    'terms': TERM_DTYPES
+}
+
+# Word cloud sources: every review of a title, and its plot summary
+TERM_SOURCES = ('reviews', 'plot')
+
+_term_counter = None
+
+
+def store_path(genre, directory=STORE_DIR):
+    return os.path.join(directory, genre)
+
+
+def parse_count(text):
+    match = COUNT_PATTERN.match(str(text).strip())
+    if not match:
+        return None
+    value = float(match.group(1).replace(',', ''))
+    return int(round(value * {'': 1, 'K': 1000, 'M': 1000000}[match.group(2).upper()]))
+
+
+def parse_money(text):
+    match = re.search(r'\$([\d,]+)', str(text or ''))
+    return int(match.group(1).replace(',', '')) if match else None
+
+
+def parse_year_duration(items):
+    year, certificate, minutes = None, None, None
+    for item in items if isinstance(items, list) else []:
+        item = item.strip()
+        duration = DURATION_PATTERN.match(item)
+        if year is None and YEAR_PATTERN.match(item):
+            year = int(item)
+        elif minutes is None and item and duration and (duration.group(1) or duration.group(2)):
+            minutes = int(duration.group(1) or 0) * 60 + int(duration.group(2) or 0)
+        elif certificate is None and item:
+            certificate = item
+    return year, certificate, minutes
+
+
+def clean_text(value):
+    return ' '.join(str(value).split()) if value else None
+
+
+def clean_people(names):
+    if not isinstance(names, list):
+        return []
+    return [name for name in (clean_text(name) for name in names) if name and name not in PEOPLE_LABELS]
+
+
+def decode_csv_row(row):
+    record = dict(row)
+    for field in NESTED_FIELDS:
+        value = record.get(field)
+        if value and value[0] in '[{':
+            try:
+                record[field] = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                pass
+    return record
+
+
+def records_from_csv(file_path):
+    csv.field_size_limit(sys.maxsize)
+    with open(file_path, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            yield decode_csv_row(row)
+
+
+def records_from_json(file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        if not file_path.endswith('.jsonl'):
+            yield from json.load(file)
+            return
+        for line in file:
+            # A crawl that is still running may have only part of its last line written
+            if line.endswith('\n') and line.strip():
+                yield json.loads(line)
+
+
+def read_appended_records(file_path, offset=0):
+    # Complete JSON Lines written after offset, and the offset just past the last of them
+    with open(file_path, 'rb') as file:
+        file.seek(offset)
+        data = file.read()
+    end = data.rfind(b'\n') + 1
+    records = [json.loads(line) for line in data[:end].decode('utf-8').splitlines() if line.strip()]
+    return records, offset + end
+
+
+def normalize_movie(record, genre=None):
+    link = record.get('movie_imdb_id', '') or ''
+    match = re.search(r'tt\d+', link)
+    title_id = match.group(0) if match else link.strip()
+
+    year, certificate, minutes = parse_year_duration(record.get('YearDuration'))
+
+    ratings = record.get('Ratings')
+    try:
+        rating = float(ratings[0]) if isinstance(ratings, list) and ratings else None
+    except ValueError:
+        rating = None
+
+    counts = {}
+    for entry in record.get('ReviewRelatedInfo') or []:
+        if isinstance(entry, dict):
+            for key, value in entry.items():
+                counts[key.strip()] = parse_count(value)
+
+    details = record.get('Details') if isinstance(record.get('Details'), dict) else {}
+    box_office = record.get('BoxOfficeDetails') if isinstance(record.get('BoxOfficeDetails'), dict) else {}
+    box_office = {clean_text(key): value for key, value in box_office.items()}
+
+    language = clean_text(details.get('Language'))
+    if language and language.startswith('Language'):
+        language = language[len('Language'):].strip()
+
+    movie = {
+        'title_id': title_id,
+        'movie_name': clean_text(record.get('movie_name')),
+        'genre': genre,
+        'year': year,
+        'certificate': certificate,
+        'duration_minutes': minutes,
+        'rating': rating,
+        'user_reviews': counts.get('User reviews'),
+        'critic_reviews': counts.get('Critic reviews'),
+        'metascore': counts.get('Metascore'),
+        'film_plot': clean_text(record.get('FilmPlot')),
+        'release_date': clean_text(details.get('Release-Date')),
+        'country': clean_text(details.get('Country-Origin')),
+        'language': language or None,
+        'budget_usd': parse_money(box_office.get('Budget')),
+        'gross_us_canada_usd': parse_money(box_office.get('Gross US & Canada')),
+        'gross_worldwide_usd': parse_money(box_office.get('Gross worldwide'))
+    }
+
+    reviews = []
+    for position, review in enumerate(record.get('UserReviews') or []):
+        try:
+            review_rating = int(str(review.get('Rating', '')).strip())
+        except ValueError:
+            review_rating = None
+        reviews.append({
+            'title_id': title_id,
+            'position': position,
+            'rating': review_rating or None,
+            'title': (review.get('Title') or '').strip(),
+            'content': (review.get('Content') or '').strip()
+        })
+
+    people = []
+    for role, field in (('director', 'Directors'), ('writer', 'Writers'), ('star', 'Stars')):
+        for position, name in enumerate(clean_people(record.get(field))):
+            people.append({'title_id': title_id, 'role': role, 'position': position, 'name': name})
+
+    return movie, reviews, people
+
+
+def term_frequencies(text):
+    # Uses the same tokenizer, stopwords and collocations as WordCloud.generate
+    global _term_counter
+    if _term_counter is None:
+        _term_counter = WordCloud()
+    return _term_counter.process_text(text) if text and text.strip() else {}
+
+
+def movie_terms(movie, reviews):
+    terms = []
+    texts = {
+        'reviews': " ".join(review['content'] for review in reviews),
+        'plot': movie['film_plot'] or ''
+    }
+    for source in TERM_SOURCES:
+        for term, count in term_frequencies(texts[source]).items():
+            terms.append({'title_id': movie['title_id'], 'source': source, 'term': term, 'count': count})
+    return terms
+
+
+def build_tables(records, genre=None, workers=None, known_scores=None):
+    movies, reviews, people, terms = [], [], [], []
+    for record in records:
+        try:
+            movie, movie_reviews, movie_people = normalize_movie(record, genre)
+            movie_term_counts = movie_terms(movie, movie_reviews)
+        except Exception as e:
+            print(f"Error normalizing movie record: {e}")
+            continue
+        movies.append(movie)
+        reviews.extend(movie_reviews)
+        people.extend(movie_people)
+        terms.extend(movie_term_counts)
+
+    # Sentiment is scored once per distinct review text and stored with the review
+    hashes, scores = score_texts((review['content'] for review in reviews), workers, known_scores)
+    for review, content_hash, score in zip(reviews, hashes, scores):
+        review['content_hash'] = content_hash
+        review['sentiment'] = score
+
+    rows = {'movies': movies, 'reviews': reviews, 'people': people, 'terms': terms}
+    return {name: pd.DataFrame(rows[name], columns=list(dtypes)).astype(dtypes) for name, dtypes in STORE_TABLES.items()}
+
+
+def save_table(path, name, table):
+    os.makedirs(path, exist_ok=True)
+    # A unique temp file per writer, since the scraper and the dashboard may both write the same store
+    fd, tmp_filename = tempfile.mkstemp(dir=path, prefix=f".{name}.", suffix='.parquet.tmp')
+    os.close(fd)
+    try:
+        table.to_parquet(tmp_filename, index=False)
+        os.replace(tmp_filename, os.path.join(path, f"{name}.parquet"))
+    except BaseException:
+        os.remove(tmp_filename)
+        raise
+
+
+def stored_sentiment(path):
+    filename = os.path.join(path, 'reviews.parquet')
+    if not os.path.exists(filename):
+        return {}
+    try:
+        reviews = pd.read_parquet(filename, columns=['content_hash', 'sentiment']).dropna()
+    except Exception:
+        return {}
+    return dict(zip(reviews['content_hash'], reviews['sentiment']))
+
+
+def write_movie_store(records, path, genre=None, workers=None):
+    tables = build_tables(records, genre, workers, stored_sentiment(path))
+    for name, table in tables.items():
+        save_table(path, name, table)
+    return tables
+
+
+def load_movie_store(path):
+    tables = {}
+    for name, dtypes in STORE_TABLES.items():
+        table = pd.read_parquet(os.path.join(path, f"{name}.parquet"))
+        # Stores written before a column existed get it back as missing values
+        for column in dtypes:
+            if column not in table.columns:
+                table[column] = pd.Series(pd.NA, index=table.index, dtype=dtypes[column])
+        tables[name] = table[list(dtypes)]
+    return tables
+
+
+def backfill_sentiment(path, workers=None):
+    tables = load_movie_store(path)
+    reviews = tables['reviews']
+    missing = reviews['sentiment'].isna()
+    if missing.any():
+        hashes, scores = score_texts(reviews.loc[missing, 'content'].fillna(''), workers)
+        reviews.loc[missing, 'content_hash'] = hashes
+        reviews.loc[missing, 'sentiment'] = scores
+        save_table(path, 'reviews', reviews)
+    return tables, int(missing.sum())
+
+
+def store_exists(path):
+    return all(os.path.exists(os.path.join(path, f"{name}.parquet")) for name in STORE_TABLES)
+
+
+def store_is_current(path, source_file):
+    if not store_exists(path):
+        return False
+    return os.path.getmtime(os.path.join(path, 'movies.parquet')) >= os.path.getmtime(source_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build movie stores from scraped CSV files or score the reviews of existing stores")
+    parser.add_argument('sources', nargs='+', help="movies_data-<genre>.csv files to convert, or store directories such as parquet_files/action to backfill sentiment for")
+    parser.add_argument('--genre', help="genre of the converted CSV files (taken from the file name when omitted)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="number of processes used to score review sentiment")
+    args = parser.parse_args(argv)
+
+    for source in args.sources:
+        try:
+            if os.path.isdir(source):
+                _, count = backfill_sentiment(source, args.workers)
+                print(f"Scored {count} reviews in {source}")
+                continue
+            genre = args.genre or os.path.splitext(os.path.basename(source))[0].replace('movies_data-', '')
+            tables = write_movie_store(records_from_csv(source), store_path(genre), genre, args.workers)
+            print(f"Wrote {len(tables['movies'])} movies to {store_path(genre)}")
+        except Exception as e:
+            print(f"Error processing '{source}': {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import csv
+import json
+import os
+
+
+class MovieOutputSink:
+    def __init__(self, json_filename, csv_filename, fieldnames, fsync_every=10, resume=False):
+        self.json_filename = json_filename
+        self.csv_filename = csv_filename
+        self.jsonl_filename = os.path.splitext(json_filename)[0] + '.jsonl'
+        self.csv_part_filename = csv_filename + '.part'
+        self.fieldnames = list(fieldnames)
+        self.fsync_every = fsync_every
+        self.count = 0
+        self._jsonl_file = None
+        self._csv_file = None
+        self._csv_writer = None
+        self._unsynced = 0
+        if resume and os.path.exists(self.jsonl_filename):
+            self._resume()
+
+    def _open(self, mode='w'):
+        for filename in (self.jsonl_filename, self.csv_part_filename):
+            directory = os.path.dirname(filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._jsonl_file = open(self.jsonl_filename, mode, encoding='utf-8')
+        self._csv_file = open(self.csv_part_filename, 'w', newline='', encoding='utf-8')
+        self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=self.fieldnames)
+        self._csv_writer.writeheader()
+
+    def _resume(self):
+        # Drop a record that was only partially written when the previous run stopped
+        with open(self.jsonl_filename, 'rb+') as jsonl_file:
+            data = jsonl_file.read()
+            if data and not data.endswith(b'\n'):
+                jsonl_file.truncate(data.rfind(b'\n') + 1)
+
+        # The CSV part file may end mid-row, so rebuild it from the JSON Lines log
+        self._open('a')
+        for record in self.iter_records():
+            self._csv_writer.writerow(record)
+            self.count += 1
+        self.sync()
+
+    def recorded_values(self, field):
+        if not os.path.exists(self.jsonl_filename):
+            return set()
+        return {record.get(field) for record in self.iter_records()}
+
+    def write(self, record):
+        if self._jsonl_file is None:
+            self._open()
+        self._jsonl_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._csv_writer.writerow(record)
+        self._jsonl_file.flush()
+        self._csv_file.flush()
+        self.count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        for file in (self._jsonl_file, self._csv_file):
+            if file is not None:
+                file.flush()
+                os.fsync(file.fileno())
+        self._unsynced = 0
+
+    def iter_records(self):
+        with open(self.jsonl_filename, 'r', encoding='utf-8') as jsonl_file:
+            for line in jsonl_file:
+                if line.strip():
+                    yield json.loads(line)
+
+    def finalize(self):
+        self.sync()
+        self.close()
+
+        # Rewrite the JSON Lines log into the indented JSON array format one record at a time
+        tmp_filename = self.json_filename + '.tmp'
+        with open(tmp_filename, 'w', encoding='utf-8') as json_file:
+            json_file.write('[')
+            for i, record in enumerate(self.iter_records()):
+                json_file.write(',\n    ' if i else '\n    ')
+                json_file.write(json.dumps(record, ensure_ascii=False, indent=4).replace('\n', '\n    '))
+            json_file.write('\n]' if self.count else ']')
+            json_file.flush()
+            os.fsync(json_file.fileno())
+        os.replace(tmp_filename, self.json_filename)
+        print(f"JSON data saved to {self.json_filename}")
+
+        os.replace(self.csv_part_filename, self.csv_filename)
+        print(f"CSV data saved to {self.csv_filename}")
+
+    def close(self):
+        for file in (self._jsonl_file, self._csv_file):
+            if file is not None and not file.closed:
+                file.close()
@@ -0,0 +1,69 @@
+import sys
+from scrape_data import get_movie_name_and_links
+from title_parser import (
+    available_parser_backends, parse_html, extract_movie_info, extract_user_reviews,
+    get_movie_name, extract_year_duration, extract_rating, extract_review_info, get_storyline,
+    get_directors_writers_stars, get_details, get_box_office_details
+)
+
+TITLE_PAGES = {
+    'body_sites/movie_structure.html': '/title/tt12037194/'
+}
+
+SEARCH_PAGES = [
+    'body_sites/output.html'
+]
+
+TITLE_EXTRACTORS = [
+    get_movie_name, extract_year_duration, extract_rating, extract_review_info, get_storyline,
+    get_directors_writers_stars, get_details, get_box_office_details
+]
+
+
+def run_extractors(path, parser):
+    with open(path, 'rb') as file:
+        doc = parse_html(file.read(), 'utf-8', parser)
+
+    results = {}
+    if path in TITLE_PAGES:
+        for extractor in TITLE_EXTRACTORS:
+            try:
+                results[extractor.__name__] = extractor(doc)
+            except Exception as e:
+                results[extractor.__name__] = f"raised {type(e).__name__}"
+        results['extract_movie_info'] = extract_movie_info(doc, TITLE_PAGES[path], [])
+    else:
+        results['get_movie_name_and_links'] = get_movie_name_and_links(doc, with_images=False)
+    results['extract_user_reviews'] = extract_user_reviews(doc)
+    return results
+
+
+def check_parity(paths, backends, reference='html.parser'):
+    mismatches = []
+    for path in paths:
+        expected = run_extractors(path, reference)
+        for parser in backends:
+            if parser == reference:
+                continue
+            actual = run_extractors(path, parser)
+            for name, value in expected.items():
+                if actual.get(name) != value:
+                    mismatches.append((path, parser, name, value, actual.get(name)))
+    return mismatches
+
+
+def main():
+    backends = available_parser_backends()
+    print(f"Checking extractor parity for backends: {', '.join(backends)}")
+    mismatches = check_parity(list(TITLE_PAGES) + SEARCH_PAGES, backends)
+    for path, parser, name, expected, actual in mismatches:
+        print(f"MISMATCH {path} [{parser}] {name}:\n  html.parser: {expected!r}\n  {parser}: {actual!r}")
+    if mismatches:
+        print(f"{len(mismatches)} extractor result(s) differ from html.parser")
+        return 1
+    print("All extractors return identical results")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
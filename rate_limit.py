@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Lower values are served first when several requests wait on the same host
+PRIORITY_DETAIL = 0
+PRIORITY_LISTING = 1
+PRIORITY_POSTER = 2
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostState:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiting = []
+        self.requests = 0
+        self.throttled = 0
+
+
+# Per-host token buckets whose rate halves on 429/503 and creeps back up on success
+class AdaptiveRateLimiter:
+    def __init__(self, requests_per_second=8.0, burst=4, min_rate=0.25, max_rate=None, increase=0.1, decrease=0.5, backoff=5.0):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate or requests_per_second * 4
+        self.increase = increase
+        self.decrease = decrease
+        self.backoff = backoff
+        self._hosts = {}
+        self._order = itertools.count()
+        self._changed = threading.Condition()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.requests_per_second, self.burst)
+        return state
+
+    def _refill(self, state, now):
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+        state.updated = now
+
+    def acquire(self, url, priority=PRIORITY_DETAIL):
+        if not self.requests_per_second or self.requests_per_second <= 0:
+            return
+        with self._changed:
+            state = self._host(url)
+            ticket = (priority, next(self._order))
+            heapq.heappush(state.waiting, ticket)
+            self._changed.notify_all()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(state, now)
+                    if state.waiting[0] != ticket:
+                        # Only the highest priority waiter watches the clock; the rest wait to move up
+                        self._changed.wait()
+                        continue
+                    delay = max(state.blocked_until - now, (1 - state.tokens) / state.rate)
+                    if delay <= 0:
+                        state.tokens -= 1
+                        state.requests += 1
+                        return
+                    self._changed.wait(delay)
+            finally:
+                state.waiting.remove(ticket)
+                heapq.heapify(state.waiting)
+                self._changed.notify_all()
+
+    def record(self, url, status_code, retry_after=None):
+        with self._changed:
+            state = self._host(url)
+            now = time.monotonic()
+            self._refill(state, now)
+            if status_code in THROTTLE_STATUSES:
+                # Multiplicative decrease, and a pause for as long as the server asked; requests that were
+                # already in flight when the host pushed back do not cut the rate a second time
+                state.throttled += 1
+                if now >= state.blocked_until:
+                    state.rate = max(self.min_rate, state.rate * self.decrease)
+                delay = parse_retry_after(retry_after)
+                state.blocked_until = max(state.blocked_until, now + (self.backoff if delay is None else delay))
+                state.tokens = 0
+            elif status_code < 400:
+                state.rate = min(self.max_rate, state.rate + self.increase)
+            self._changed.notify_all()
+
+    def stats(self):
+        with self._changed:
+            now = time.monotonic()
+            return {
+                host: {
+                    'rate': round(state.rate, 3),
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                    'waiting': len(state.waiting),
+                    'blocked_for': round(max(0.0, state.blocked_until - now), 1)
+                }
+                for host, state in self._hosts.items()
+            }
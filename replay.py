@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+from http_cache import build_response, normalize_url, page_type
+
+FIXTURE_DIR = 'body_sites'
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_CONTENT_TYPE = 'text/html; charset=utf-8'
+
+
+def fixture_key(url):
+    # Fixtures are keyed by path and query only, so a recording replays against any base URL
+    parts = urlsplit(normalize_url(url))
+    return urlunsplit(('', '', parts.path, parts.query, ''))
+
+
+class FixtureStore:
+    def __init__(self, directory=FIXTURE_DIR, recording=False):
+        self.directory = directory
+        self.recording = recording
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self.stats = {'replayed': 0, 'missing': 0, 'recorded': 0}
+        self._lock = threading.Lock()
+        self.pages = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as file:
+                self.pages = json.load(file)['pages']
+        elif not recording:
+            raise FileNotFoundError(f"No fixture manifest at {self.manifest_path}")
+
+    def urls(self, kind=None):
+        return [key for key in self.pages if kind is None or page_type(key) == kind]
+
+    def read(self, key):
+        with open(os.path.join(self.directory, self.pages[key]['file']), 'rb') as file:
+            return file.read()
+
+    def replay(self, url):
+        key = fixture_key(url)
+        entry = self.pages.get(key)
+        if entry is None:
+            with self._lock:
+                self.stats['missing'] += 1
+            response = build_response(url, 404, {'Content-Type': DEFAULT_CONTENT_TYPE}, b'')
+            response.reason = 'Not Recorded'
+            raise requests.exceptions.HTTPError(f"404 Not Recorded: {key}", response=response)
+        with self._lock:
+            self.stats['replayed'] += 1
+        return build_response(url, 200, {'Content-Type': entry.get('content_type', DEFAULT_CONTENT_TYPE)}, self.read(key))
+
+    def record(self, url, response):
+        key = fixture_key(url)
+        with self._lock:
+            entry = self.pages.get(key)
+            name = entry['file'] if entry else f"{page_type(key)}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}.html"
+            self._write(name, response.content)
+            self.pages[key] = {'file': name, 'content_type': response.headers.get('Content-Type', DEFAULT_CONTENT_TYPE)}
+            self._write(MANIFEST_NAME, json.dumps({'pages': self.pages}, indent=2, sort_keys=True).encode('utf-8') + b'\n')
+            self.stats['recorded'] += 1
+
+    def _write(self, name, content):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(content)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
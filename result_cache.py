@@ -0,0 +1,173 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 15 * 60
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class SQLiteResultBackend:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        ''')
+        self._db.commit()
+
+    def get(self, namespace, key):
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value, stored_at, expires_at FROM results WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def set(self, namespace, key, value, stored_at, expires_at):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO results (namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+                (namespace, key, json.dumps(value), stored_at, expires_at)
+            )
+            self._db.execute('DELETE FROM results WHERE expires_at <= ?', (time.time(),))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ResultCache:
+    def __init__(self, namespace, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.backend = backend
+        self.stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'coalesced': 0, 'stores': 0, 'evictions': 0}
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[2] > now:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            del self._entries[key]
+        return None
+
+    def _remember(self, key, value, stored_at, expires_at):
+        self._entries[key] = (value, stored_at, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+
+        # Another worker process may already have stored the result in the shared backend
+        if self.backend is not None:
+            entry = self.backend.get(self.namespace, key)
+            if entry is not None:
+                with self._lock:
+                    self._remember(key, *entry)
+                    self.stats['shared_hits'] += 1
+                return entry[0]
+        return None
+
+    def get(self, key):
+        value = self._get(key)
+        if value is None:
+            with self._lock:
+                self.stats['misses'] += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        stored_at = time.time()
+        expires_at = stored_at + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, stored_at, expires_at)
+            self.stats['stores'] += 1
+        if self.backend is not None:
+            try:
+                self.backend.set(self.namespace, key, value, stored_at, expires_at)
+            except Exception as e:
+                print(f"Error storing result in shared cache: {e}")
+
+    def get_or_compute(self, key, compute, ttl=None):
+        value = self._get(key)
+        if value is not None:
+            return value
+
+        # Single flight: the first caller computes, concurrent callers for the same key wait for its result
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = {'done': threading.Event(), 'value': None, 'error': None}
+                self._in_flight[key] = flight
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            return flight['value']
+
+        try:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+            flight['value'] = value
+            return value
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight['done'].set()
+
+    def summary(self):
+        now = time.time()
+        with self._lock:
+            stats = dict(self.stats)
+            ages = [now - stored_at for _, stored_at, expires_at in self._entries.values() if expires_at > now]
+            in_flight = len(self._in_flight)
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses'] + stats['coalesced']
+        stats.update({
+            'entries': len(ages),
+            'in_flight': in_flight,
+            'hit_rate': round((stats['hits'] + stats['shared_hits'] + stats['coalesced']) / lookups, 4) if lookups else None,
+            'oldest_age': round(max(ages), 1) if ages else None,
+            'mean_age': round(sum(ages) / len(ages), 1) if ages else None,
+            'ttl': self.ttl,
+            'shared_backend': self.backend.path if self.backend is not None else None
+        })
+        return stats
@@ -1,44 +1,227 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+import argparse
+import asyncio
 import json
-import csv
-
-def parse_url(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+from rate_limit import PRIORITY_DETAIL, PRIORITY_LISTING, PRIORITY_POSTER, THROTTLE_STATUSES, AdaptiveRateLimiter
+from http_cache import ResponseCache, DEFAULT_MAX_BYTES, page_type
+from output_sinks import MovieOutputSink
+from checkpoints import MAX_ATTEMPTS, CrawlCheckpoint
+from replay import FixtureStore
+from metrics import metrics
+import title_parser
+# The parsing side lives in title_parser; it is re-exported so existing scrape_data imports keep working
+from title_parser import (
+    PARSER_BACKENDS, EXTRACTION_MODES, TITLE_SELECTORS, MOVIE_FIELDS, available_parser_backends, set_parser_backend,
+    set_extraction_mode, parse_html, find_section, locate_title_sections, get_movie_name, parse_movie_name,
+    extract_year_duration, parse_year_duration, extract_rating, parse_rating, extract_review_info, parse_review_info,
+    get_storyline, parse_storyline, parse_review_page, extract_user_reviews, get_directors_writers_stars,
+    parse_directors_writers_stars, get_details, parse_details, get_box_office_details, parse_box_office_details,
+    build_movie_info, extract_movie_info, extract_title_page, parse_title_pages
+)
+
+BASE_URL = os.environ.get('IMDB_BASE_URL', 'https://www.imdb.com').rstrip('/')
+
+POSTER_WORKERS = 8
+
+# Every request to a host draws from one adaptive budget; detail pages go first when it is tight
+REQUESTS_PER_SECOND = float(os.environ.get('IMDB_REQUESTS_PER_SECOND', 8.0))
+THROTTLE_RETRIES = 3
+
+rate_limiter = AdaptiveRateLimiter(REQUESTS_PER_SECOND)
+
+def configure_rate_limiter(requests_per_second=REQUESTS_PER_SECOND):
+    global rate_limiter
+    rate_limiter = AdaptiveRateLimiter(requests_per_second)
+    return rate_limiter
+
+PAGE_PRIORITIES = {
+    'title': PRIORITY_DETAIL,
+    'reviews': PRIORITY_LISTING,
+    'search': PRIORITY_LISTING,
+    'mediaviewer': PRIORITY_POSTER
+}
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+POOL_SIZE = 16
+REQUEST_TIMEOUT = (5, 30)
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+# Retried by fetch_remote rather than urllib3, so every retry waits its turn with the rate limiter
+RETRY_STATUSES = (500, 502, 504)
+
+def create_session(pool_size=POOL_SIZE, retries=RETRY_TOTAL, backoff=RETRY_BACKOFF):
+    # The adapter only retries failed connections; HTTP error statuses come back to fetch_remote
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(),
+        allowed_methods=('GET', 'HEAD'),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+session = create_session()
+
+def configure_session(pool_size=POOL_SIZE, timeout=REQUEST_TIMEOUT, retries=RETRY_TOTAL, backoff=RETRY_BACKOFF):
+    global session, REQUEST_TIMEOUT, RETRY_TOTAL, RETRY_BACKOFF
+    old_session = session
+    session = create_session(pool_size, retries, backoff)
+    REQUEST_TIMEOUT = timeout
+    RETRY_TOTAL = retries
+    RETRY_BACKOFF = backoff
+    old_session.close()
+    return session
+
+CACHE_PATH = os.environ.get('IMDB_HTTP_CACHE', '.http_cache/responses.sqlite')
+
+# The default cache is opened on first use, so processes that only import this module never touch it
+response_cache = None
+cache_pending = bool(CACHE_PATH)
+cache_lock = threading.Lock()
+
+def get_response_cache():
+    global response_cache, cache_pending
+    if cache_pending:
+        with cache_lock:
+            if cache_pending:
+                response_cache = ResponseCache(CACHE_PATH)
+                cache_pending = False
+    return response_cache
+
+def configure_cache(path=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+    global response_cache, cache_pending
+    with cache_lock:
+        old_cache = response_cache
+        response_cache = ResponseCache(path, max_bytes, ttls) if path else None
+        cache_pending = False
+    if old_cache is not None:
+        old_cache.close()
+    return response_cache
+
+# Set by --replay (serve every page from saved fixtures) or --record (save every fetched page as a fixture)
+fixtures = None
+
+def configure_fixtures(directory=None, recording=False):
+    global fixtures
+    fixtures = FixtureStore(directory, recording) if directory else None
+    return fixtures
+
+def fetch(url, headers=None, timeout=None, priority=None):
+    kind = page_type(url)
+    with metrics.span('fetch', page=kind):
+        if fixtures is not None and not fixtures.recording:
+            response = fixtures.replay(url)
+        else:
+            response = fetch_remote(url, headers, timeout, priority)
+            if fixtures is not None:
+                fixtures.record(url, response)
+    metrics.increment('response_bytes', len(response.content), page=kind)
+    return response
+
+def fetch_remote(url, headers=None, timeout=None, priority=None):
+    cache = get_response_cache()
+    kind = page_type(url)
+    entry = cache.lookup(url) if cache is not None else None
+    if entry and entry['fresh']:
+        metrics.increment('http_cache', result='hit')
+        return cache.response(url, entry)
+
+    if entry:
+        headers = dict(headers or {}, **cache.validators(entry))
+    if priority is None:
+        priority = PAGE_PRIORITIES.get(kind, PRIORITY_LISTING)
+    throttled = failed = 0
+    while True:
+        rate_limiter.acquire(url, priority)
+        response = session.get(url, headers=headers, timeout=timeout or REQUEST_TIMEOUT)
+        rate_limiter.record(url, response.status_code, response.headers.get('Retry-After'))
+        metrics.increment('http_responses', page=kind, status=response.status_code)
+        if response.status_code in THROTTLE_STATUSES and throttled < THROTTLE_RETRIES:
+            throttled += 1
+            metrics.increment('retries', page=kind, reason='throttled')
+        elif response.status_code in RETRY_STATUSES and failed < RETRY_TOTAL:
+            # Exponential pause like urllib3's backoff, then back in line for a token
+            time.sleep(RETRY_BACKOFF * 2 ** failed)
+            failed += 1
+            metrics.increment('retries', page=kind, reason='server_error')
+        else:
+            break
+    if entry and response.status_code == 304:
+        metrics.increment('http_cache', result='revalidated')
+        cache.revalidated(url)
+        return cache.response(url, entry)
+    if cache is not None:
+        metrics.increment('http_cache', result='miss')
+    response.raise_for_status()
+    if cache is not None:
+        cache.store(url, response)
+    return response
+
+def search_url(genre, start=1):
+    url = f"{BASE_URL}/search/title/?genres={genre}&title_type=feature"
+    return f"{url}&start={start}" if start > 1 else url
+
+def fetch_page(url):
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  
+        response = fetch(url)
         content = response.content
         encoding = response.encoding if 'charset' in response.headers.get('content-type', '').lower() else 'utf-8'
-        soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
-        return soup
+        return content, encoding
     except requests.exceptions.HTTPError as e:
+        metrics.increment('fetch_errors', page=page_type(url), kind='http')
         print(f"HTTP Error Occurred: \n Code: {e.response.status_code} \n Reason: {e.response.reason}")
     except requests.exceptions.RequestException as e:
+        metrics.increment('fetch_errors', page=page_type(url), kind='request')
         print(f"Request Error Occurred: {e}")
     except Exception as e:
+        metrics.increment('fetch_errors', page=page_type(url), kind='other')
+        print(f"An error occurred: {e}")
+    return None
+
+def parse_url(url, parser=None):
+    page = fetch_page(url)
+    if page is None:
+        return None
+    try:
+        content, encoding = page
+        soup = parse_html(content, encoding, parser)
+        return soup
+    except Exception as e:
+        metrics.increment('extractor_failures', extractor='parse_html')
         print(f"An error occurred: {e}")
     return None
 
 
 
 def scrape_movie_image(imdb_id):
-    url = f"https://www.imdb.com/title/{imdb_id}/mediaviewer/"
+    url = f"{BASE_URL}/title/{imdb_id}/mediaviewer/"
     print(url)
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
 
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = fetch(url)
+        soup = parse_html(response.content)
 
         urls = []
         for tag in soup.find_all('img'):
@@ -51,277 +234,478 @@ def scrape_movie_image(imdb_id):
             return urls[0]
     
     except requests.exceptions.RequestException as e:
+        metrics.increment('fetch_errors', page='mediaviewer', kind='request')
         print(f"Request Error Occurred: {e}")
     except Exception as e:
+        metrics.increment('extractor_failures', extractor='movie_image')
         print(f"An error occurred: {e}")
 
     return None
 
-def get_movie_name(body):
-    return body.find('span', class_ = 'hero__primary-text').get_text()
+def get_imdb_id(link):
+    match = re.search(r'tt\d+', link or '')
+    return match.group(0) if match else None
+
+def resolve_movie_image(imdb_id):
+    return scrape_movie_image(imdb_id) if imdb_id else None
 
+def resolve_movie_images(imdb_ids, max_workers=POSTER_WORKERS):
+    if not imdb_ids:
+        return []
+    if max_workers <= 1:
+        return [resolve_movie_image(imdb_id) for imdb_id in imdb_ids]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(imdb_ids))) as executor:
+        return list(executor.map(resolve_movie_image, imdb_ids))
 
-def get_movie_name_and_links(doc):
+def get_movie_name_and_links(doc, max_workers=POSTER_WORKERS, with_images=True):
     data = []
     try:
-        for container in doc.find_all('a', {'class': 'ipc-title-link-wrapper'}):
-            link = container.get('href', '')
-            movie = container.find('h3', {'class': 'ipc-title__text'}).get_text(strip=True)
-            movie_image_url = scrape_movie_image(link.split('/')[2])
-            movie_data = {'movie': movie, 'link': link, 'ImageUrl' : movie_image_url }
-            data.append(movie_data)
+        with metrics.span('extract', extractor='movie_name_and_links'):
+            for container in doc.find_all('a', {'class': 'ipc-title-link-wrapper'}):
+                link = container.get('href', '')
+                movie = container.find('h3', {'class': 'ipc-title__text'}).get_text(strip=True)
+                data.append({'movie': movie, 'link': link, 'ImageUrl': None})
     except Exception as e:
+        metrics.increment('extractor_failures', extractor='movie_name_and_links')
         print(f"Error extracting movie names and links: {e}")
+
+    if not with_images:
+        return data
+    image_urls = resolve_movie_images([get_imdb_id(item['link']) for item in data], max_workers)
+    for item, movie_image_url in zip(data, image_urls):
+        item['ImageUrl'] = movie_image_url
     return data
 
-def extract_year_duration(body):
-    try:
-        info = body.find('ul', {'class': 'ipc-inline-list ipc-inline-list--show-dividers sc-d8941411-2 cdJsTz baseAlt'})
-        if info:
-            result = [s.strip() for s in info.stripped_strings]
-            return result
-    except Exception as e:
-        print(f"Error extracting year and duration: {e}")
-    return "N/A"
+def user_reviews_url(url):
+    return f"{BASE_URL}/title/{url.split('/')[-2]}/reviews?spoiler=hide&sort=curated&dir=desc&ratingFilter=0"
 
-def extract_rating(body):
-    try:
-        res = body.find('div', {'data-testid': 'hero-rating-bar__aggregate-rating__score'})
-        if res:
-            result = [s.strip() for s in res.stripped_strings]
-            return result
-    except Exception as e:
-        print(f"Error extracting rating: {e}")
-    return "No rating found"
+def get_user_reviews(url, parser=None):
+    return extract_user_reviews(parse_url(user_reviews_url(url), parser))
 
-def extract_review_info(movie_body):
-    store = []
-    try:
-        reviews = movie_body.find_all('span', {'class': 'three-Elements'})
-        if reviews:
-            for data in reviews:
-                header = data.find('span', class_='label').get_text(strip=True)
-                score = data.find('span', class_='score').get_text(strip=True)
-                store.append({header: score})
-    except Exception as e:
-        print(f"Error extracting review info: {e}")
-    return store
-
-def get_storyline(movie_body):
-    text = movie_body.find('div',{'class': 'ipc-html-content-inner-div'})
-    if text:
-        story = ' '.join([s.strip() for s in text.stripped_strings])
-        return story
-    else:
-        return "No storyline found"
-        # return " "
-    
-def get_user_reviews(url):
-    user_review_url = f"https://www.imdb.com/title/{url.split('/')[-2]}/reviews?spoiler=hide&sort=curated&dir=desc&ratingFilter=0"
-    review_body = parse_url(user_review_url)
-    reviews = []
+def get_movie_info(link, parser=None, mode=None):
+    template = f"{BASE_URL}{link}"
+    print(template)
+    page = fetch_page(template)
+    if page is None:
+        print(f"Failed to retrieve data for {template}")
+        return None
+
+    content, encoding = page
+    return extract_title_page(content, encoding, link, get_user_reviews(link, parser), parser, mode)
 
-    if review_body:
+def fetch_title_pages(link):
+    template = f"{BASE_URL}{link}"
+    print(template)
+    return fetch_page(template), fetch_page(user_reviews_url(link))
+
+CHECKPOINT_PATH = '.crawl_state/checkpoints.sqlite'
+
+SEARCH_PAGE_SIZE = 50
+SEARCH_WORKERS = 4
+SEARCH_BUFFERED_PAGES = 8
+
+def iter_search_pages(genre, limit=None, max_pages=1, stop=None):
+    seen = set()
+    page = 0
+    while (max_pages is None or page < max_pages) and (limit is None or len(seen) < limit):
+        if stop is not None and stop.is_set():
+            return
+        doc = parse_url(search_url(genre, page * SEARCH_PAGE_SIZE + 1))
+        if doc is None:
+            if page == 0:
+                print(f"Failed to retrieve the search page for {genre}.")
+            return
+
+        # A page without unseen titles means the results ran out (or paging is being ignored)
+        items = [item for item in get_movie_name_and_links(doc, with_images=False) if get_imdb_id(item['link']) not in seen]
+        if limit is not None:
+            items = items[:limit - len(seen)]
+        if not items:
+            return
+        seen.update(get_imdb_id(item['link']) for item in items)
+        yield items
+        page += 1
+
+def iter_search_links(genres, limit=None, max_pages=1, workers=SEARCH_WORKERS, max_buffered=SEARCH_BUFFERED_PAGES):
+    # Bounded, so walkers stop requesting search pages while the detail crawl is behind
+    results = queue.Queue(maxsize=max_buffered)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                results.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def walk(index, genre):
         try:
-            for each in review_body.find_all('div', class_='review-container'):
-                rating_elem = each.find('span', class_="point-scale")
-                rating = rating_elem.find_previous_sibling('span').text.strip() if rating_elem else "0"
-                title = each.find('a', class_='title').text.strip()
-                review_content = each.find('div', class_='content').text.strip()
-                reviews.append({"Rating": rating, "Title": title, "Content": review_content})
+            for items in iter_search_pages(genre, limit, max_pages, stop):
+                if not put((index, items)):
+                    return
         except Exception as e:
-            print(f"Error extracting user reviews: {e}")
-    return reviews
-
-def get_directors_writers_stars(body):
-    Directors = []
-    Writers = []
-    Stars = []
-    section = body.find('ul' , class_ = 'ipc-metadata-list ipc-metadata-list--dividers-all title-pc-list ipc-metadata-list--baseAlt')
-    
-    for dir_name in section.find_all('li' , class_ = 'ipc-metadata-list__item')[0].strings:
-        if dir_name != 'Directors' :
-            Directors.append(dir_name)
-
-    for writer_name in section.find_all('li' , class_ = 'ipc-metadata-list__item')[1].strings:
-        if writer_name != 'Writers' :
-            Writers.append(writer_name)
-
-    for star_name in section.find_all('li' , class_ = 'ipc-metadata-list__item')[2].strings:
-        if star_name !=  'Stars':
-            Stars.append(star_name)
-
-    return Directors,Writers,Stars
-
-def get_details(body):
-    details = body.find('section', {'data-testid': 'Details'})
-    if not details:
-        return {}
-
-    release_date = 'N/A'
-    origin_country = 'N/A'
-    language = 'N/A'
-
-    try:
-        release_date = details.find_all('li')[1].text
-    except (IndexError, AttributeError):
-        pass
-
-    try:
-        origin_country = details.find_all('li')[3].text
-    except (IndexError, AttributeError):
-        pass
-
-    try:
-        language = details.find_all('li')[7].text
-    except (IndexError, AttributeError):
-        pass
-
-    info = {
-        'Release-Date': release_date,
-        'Country-Origin': origin_country,
-        'Language': language
-    }
-
-    return info
-
-def get_box_office_details(body):
-    data = {}
-    box_office_body = body.find('section', {'data-testid': 'BoxOffice'})
-    if not box_office_body:
-        return data
-
-    try:
-        budget_text = box_office_body.find_all('li')[0].get_text()
-        data['Budget'] = '$' + budget_text.split('$')[1]
-    except (IndexError, AttributeError, IndexError):
-        data['Budget'] = 'N/A'
-
-    try:
-        revenue_text = box_office_body.find_all('li')[2].get_text()
-        key = revenue_text.split('$')[0]
-        value = '$' + revenue_text.split('$')[1]
-        data[key] = value
-    except (IndexError, AttributeError, IndexError):
-        pass
+            print(f"Error crawling search results for {genre}: {e}")
+        finally:
+            put((index, None))
 
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(genres))))
     try:
-        text = box_office_body.find_all('li')[4].get_text()
-        dollar_index = text.find('$')
-        date_index = next(i for i in range(dollar_index + 1, len(text)) if text[i].isalpha())
-        location = text[:dollar_index]
-        collections = text[dollar_index:date_index]
-        date = text[date_index:]
-        data[location] = {'Collection': collections, 'Date': date}
-    except (IndexError, AttributeError, StopIteration):
-        pass
-
-    try:
-        other_revenue_text = box_office_body.find_all('li')[7].get_text()
-        key = other_revenue_text.split('$')[0]
-        value = '$' + other_revenue_text.split('$')[1]
-        data[key] = value
-    except (IndexError, AttributeError, IndexError):
-        pass
-
-    return data
-
-
-def get_movie_info(link):
-    template = f"https://www.imdb.com{link}"
-    print(template)
-    movie_body = parse_url(template)
-    if movie_body is None:
-        print(f"Failed to retrieve data for {template}")
+        for index, genre in enumerate(genres):
+            executor.submit(walk, index, genre)
+
+        # Pages are released as soon as they arrive, taking turns between the genres that have one waiting,
+        # so no genre holds up the others; a title listed under several genres is handed on once
+        ready = [deque() for _ in genres]
+        walking = len(genres)
+        buffered = 0
+        seen = set()
+        turn = 0
+        while walking or buffered:
+            while walking and buffered < max_buffered:
+                try:
+                    index, items = results.get(block=not buffered)
+                except queue.Empty:
+                    break
+                if items is None:
+                    walking -= 1
+                else:
+                    ready[index].append(items)
+                    buffered += 1
+            if not buffered:
+                continue
+
+            index = next(i % len(genres) for i in range(turn, turn + len(genres)) if ready[i % len(genres)])
+            turn = index + 1
+            buffered -= 1
+            for item in ready[index].popleft():
+                title_id = get_imdb_id(item['link']) or item['link']
+                if title_id not in seen:
+                    seen.add(title_id)
+                    yield genres[index], item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+def iter_movie_details(links, skip_ids=None, on_failure=None):
+    for i, (genre, item) in enumerate(links, start=1):
+        if skip_ids and get_imdb_id(item['link']) in skip_ids:
+            print(f"Skipping Movie {i}: {item['movie']} (already scraped or out of attempts)")
+            continue
+        try:
+            print(f"Processing Movie {i}: {item['movie']}")
+            movie_info = get_movie_info(item['link'])
+            if not movie_info:
+                raise ValueError("no movie data could be extracted")
+            movie_info["name"] = item['movie']
+            metrics.increment('titles', status='scraped')
+            yield genre, movie_info
+        except Exception as e:
+            metrics.increment('titles', status='failed')
+            print(f"Error processing movie {item['movie']}: {e}")
+            if on_failure:
+                on_failure(genre, item, e)
+
+PARSE_QUEUE_FACTOR = 2
+
+def create_parse_pool(workers):
+    # Workers are spawned rather than forked, since fetch threads may be holding locks when one starts
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+def iter_movie_details_pooled(links, parse_workers, fetch_workers=8, skip_ids=None, on_failure=None):
+    parse_pool = create_parse_pool(parse_workers)
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers)
+    # Fetchers block once this many fetched titles are waiting for a parse worker, so the network can't run ahead
+    parse_slots = threading.BoundedSemaphore(parse_workers * PARSE_QUEUE_FACTOR)
+    parser, mode = title_parser.PARSER_BACKEND, title_parser.EXTRACTION_MODE
+
+    def fetch_title(link):
+        title_page, review_page = fetch_title_pages(link)
+        if title_page is None:
+            raise ValueError(f"Failed to retrieve data for {BASE_URL}{link}")
+        parse_slots.acquire()
+        try:
+            parsed = parse_pool.submit(parse_title_pages, link, title_page, review_page, parser, mode)
+        except BaseException:
+            parse_slots.release()
+            raise
+        parsed.add_done_callback(lambda _: parse_slots.release())
+        return parsed
+
+    def collect(genre, item, fetched):
+        try:
+            movie_info, recorded = fetched.result().result()
+            metrics.merge(recorded)
+            if not movie_info:
+                raise ValueError("no movie data could be extracted")
+            movie_info["name"] = item['movie']
+            metrics.increment('titles', status='scraped')
+            return genre, movie_info
+        except Exception as e:
+            metrics.increment('titles', status='failed')
+            print(f"Error processing movie {item['movie']}: {e}")
+            if on_failure:
+                on_failure(genre, item, e)
         return None
 
     try:
-        movie_name = get_movie_name(movie_body)
-        year_duration = extract_year_duration(movie_body)
-        ratings = extract_rating(movie_body)
-        review_related_info = extract_review_info(movie_body)
-        film_plot = get_storyline(movie_body)
-        user_reviews = get_user_reviews(link)
-        Directors, Writers, Stars = get_directors_writers_stars(movie_body)
-        details_section = get_details(movie_body)
-        box_office_details = get_box_office_details(movie_body)
-
-        movie_info = {
-            "movie_name" :  movie_name,
-            "movie_imdb_id": link,
-            "YearDuration": year_duration,
-            "Ratings": ratings,
-            "ReviewRelatedInfo": review_related_info,
-            "FilmPlot": film_plot,
-            "UserReviews": user_reviews,
-            "Directors": Directors,
-            "Writers": Writers,
-            "Stars": Stars,
-            "Details": details_section,
-            "BoxOfficeDetails": box_office_details
-        }
+        # Same ordered, bounded window as the async crawler: fetch threads feed the parse processes
+        in_flight = deque()
+        for i, (genre, item) in enumerate(links, start=1):
+            if skip_ids and get_imdb_id(item['link']) in skip_ids:
+                print(f"Skipping Movie {i}: {item['movie']} (already scraped or out of attempts)")
+                continue
+            print(f"Processing Movie {i}: {item['movie']}")
+            in_flight.append((genre, item, fetch_pool.submit(fetch_title, item['link'])))
+            if len(in_flight) >= 2 * fetch_workers:
+                result = collect(*in_flight.popleft())
+                if result:
+                    yield result
+        while in_flight:
+            result = collect(*in_flight.popleft())
+            if result:
+                yield result
+    finally:
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+
+async def iter_movie_details_async(links, concurrency=8, skip_ids=None, on_failure=None, parse_workers=0):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    link_reader = ThreadPoolExecutor(max_workers=1)
+    parse_pool = create_parse_pool(parse_workers) if parse_workers else None
+    parser, mode = title_parser.PARSER_BACKEND, title_parser.EXTRACTION_MODE
+
+    def run(func, *args):
+        return loop.run_in_executor(executor, func, *args)
+
+    async def parse_pages(link, page, review_page):
+        if parse_pool is None:
+            user_reviews = await run(parse_review_page, *review_page) if review_page else []
+            return await run(extract_title_page, *page, link, user_reviews)
+        movie_info, recorded = await loop.run_in_executor(parse_pool, parse_title_pages, link, page, review_page, parser, mode)
+        metrics.merge(recorded)
         return movie_info
-    except Exception as e:
-        print(f"Error extracting movie info for {link}: {e}")
-        return None
-
-
-def main():
-    genre = input("Enter Genre: ")
 
-    url = f"https://www.imdb.com/search/title/?genres={genre}&title_type=feature"
+    async def process(i, genre, item):
+        link = item['link']
+        print(f"Processing Movie {i}: {item['movie']}")
+        try:
+            page, review_page = await asyncio.gather(
+                run(fetch_page, f"{BASE_URL}{link}"),
+                run(fetch_page, user_reviews_url(link))
+            )
+            if page is None:
+                raise ValueError(f"Failed to retrieve data for {BASE_URL}{link}")
+            movie_info = await parse_pages(link, page, review_page)
+            if not movie_info:
+                raise ValueError("no movie data could be extracted")
+            movie_info["name"] = item['movie']
+            metrics.increment('titles', status='scraped')
+            return genre, movie_info
+        except Exception as e:
+            metrics.increment('titles', status='failed')
+            print(f"Error processing movie {item['movie']}: {e}")
+            if on_failure:
+                on_failure(genre, item, e)
+        return None
 
-    doc = parse_url(url)
+    links = iter(links)
+    try:
+        # Keep a bounded window of titles in flight and hand results back in the order the links arrived
+        in_flight = deque()
+        i = 0
+        while True:
+            link = await loop.run_in_executor(link_reader, next, links, None)
+            if link is None:
+                break
+            genre, item = link
+            i += 1
+            if skip_ids and get_imdb_id(item['link']) in skip_ids:
+                print(f"Skipping Movie {i}: {item['movie']} (already scraped or out of attempts)")
+                continue
+            in_flight.append(asyncio.ensure_future(process(i, genre, item)))
+            if len(in_flight) >= 2 * concurrency:
+                result = await in_flight.popleft()
+                if result:
+                    yield result
+        while in_flight:
+            result = await in_flight.popleft()
+            if result:
+                yield result
+    finally:
+        executor.shutdown(wait=False)
+        link_reader.shutdown(wait=False)
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+
+def first_search_page_links(genre, limit, with_images=True):
+    doc = parse_url(search_url(genre))
     if doc is None:
         print("Failed to retrieve the main search page. Exiting.")
-        return
+        return []
 
-    name_link_list = get_movie_name_and_links(doc)
+    name_link_list = get_movie_name_and_links(doc, with_images=with_images)
     if not name_link_list:
         print("No movies found for the specified genre. Exiting.")
-        return
+        return []
 
-    data_list = []
     print("Processing movies...")
-    
-    for i, item in enumerate(name_link_list[:20], start=1):
-        try:
-            print(f"Processing Movie {i}: {item['movie']}")
-            movie_info = get_movie_info(item['link'])
-            movie_info["name"] = item['movie']
-            
-            if movie_info:
-                data_list.append(movie_info)
-        except Exception as e:
-            print(f"Error processing movie {item['movie']}: {e}")
-        if len(data_list) >= 20:
-            break
+    return [(genre, item) for item in name_link_list[:limit]]
 
-    if not data_list:
-        print("No movie data collected. Exiting.")
-        return
+async def iter_genre_async(genre, limit=20, concurrency=8, skip_ids=None, on_failure=None):
+    links = await asyncio.to_thread(first_search_page_links, genre, limit, False)
+    async for _, movie_info in iter_movie_details_async(links, concurrency, skip_ids, on_failure):
+        yield movie_info
+
+async def crawl_genre_async(genre, limit=20, concurrency=8):
+    return [movie_info async for movie_info in iter_genre_async(genre, limit, concurrency)]
 
-    json_filename = f"data_collect/movie_category-{genre}.json"
-    csv_filename = f"csv_files/movies_data-{genre}.csv"
+def iter_genre(genre, limit=20, skip_ids=None, on_failure=None):
+    for _, movie_info in iter_movie_details(first_search_page_links(genre, limit, False), skip_ids, on_failure):
+        yield movie_info
 
+def crawl_genre(genre, limit=20):
+    return list(iter_genre(genre, limit))
+
+def output_sink(genre, resume=False):
+    return MovieOutputSink(
+        f"data_collect/movie_category-{genre}.json",
+        f"csv_files/movies_data-{genre}.csv",
+        MOVIE_FIELDS,
+        resume=resume
+    )
+
+def save_movie_store(genre, sink):
+    try:
+        # Imported here so spawned parse workers, which re-import this script, don't load pandas and friends
+        from movie_store import store_path, write_movie_store
+    except ImportError as e:
+        print(f"Skipping the movie store for {genre} ({e}); the JSON and CSV outputs are complete")
+        return
+
+    path = store_path(genre)
     try:
-        with open(json_filename, 'w', encoding='utf-8') as json_file:
-            json.dump(data_list, json_file, ensure_ascii=False, indent=4)
-        print(f"JSON data saved to {json_filename}")
+        tables = write_movie_store(sink.iter_records(), path, genre)
+        print(f"Movie store saved to {path} ({len(tables['movies'])} movies)")
     except Exception as e:
-        print(f"Error saving JSON data: {e}")
+        print(f"Error saving movie store: {e}")
 
+def save_results(genre, data_list):
+    sink = output_sink(genre)
     try:
-        keys = data_list[0].keys()
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csv_file:
-            dict_writer = csv.DictWriter(csv_file, fieldnames=keys)
-            dict_writer.writeheader()
-            dict_writer.writerows(data_list)
-        print(f"CSV data saved to {csv_filename}")
+        for movie_info in data_list:
+            sink.write(movie_info)
+        sink.finalize()
+        save_movie_store(genre, sink)
+        print("Data collection successful.")
     except Exception as e:
-        print(f"Error saving CSV data: {e}")
+        print(f"Error saving data: {e}")
+    finally:
+        sink.close()
+
+async def stream_details_async(links, concurrency, write, skip_ids=None, on_failure=None, parse_workers=0):
+    async for genre, movie_info in iter_movie_details_async(links, concurrency, skip_ids, on_failure, parse_workers):
+        write(genre, movie_info)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape IMDb movies for one or more genres")
+    parser.add_argument('--genre', help="genre to crawl, or several separated by commas (prompted for when omitted)")
+    parser.add_argument('--limit', type=int, default=20, help="maximum number of search results to collect per genre")
+    parser.add_argument('--pages', type=int, default=1, help="number of search result pages to walk per genre (0 for all)")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="fetch title and review pages concurrently")
+    parser.add_argument('--concurrency', type=int, default=8, help="maximum concurrent fetches in --async or --parse-workers mode")
+    parser.add_argument('--parse-workers', type=int, default=0, help="parse fetched pages in this many worker processes (0 parses them in the fetching thread)")
+    parser.add_argument('--rate', type=float, default=REQUESTS_PER_SECOND, help="starting requests per second per host; lowered on 429/503 responses and raised again on success (0 disables)")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the on-disk HTTP response cache")
+    fixture_mode = parser.add_mutually_exclusive_group()
+    fixture_mode.add_argument('--replay', metavar='DIR', help="serve every page from the fixture directory instead of the network")
+    fixture_mode.add_argument('--record', metavar='DIR', help="save every fetched page to the fixture directory")
+    parser.add_argument('--parser', choices=available_parser_backends(), default=title_parser.PARSER_BACKEND, help="BeautifulSoup parser backend")
+    parser.add_argument('--extraction', choices=EXTRACTION_MODES, default=title_parser.EXTRACTION_MODE, help="read title metadata from the embedded JSON first (auto) or only from the DOM")
+    parser.add_argument('--resume', action='store_true', help="skip titles a previous run already scraped and retry the failed ones")
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS, help="with --resume, stop retrying a title after this many failed attempts")
+    parser.add_argument('--metrics', metavar='PATH', help="also write the end-of-run metrics summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    set_parser_backend(args.parser)
+    set_extraction_mode(args.extraction)
+
+    if args.no_cache:
+        configure_cache(None)
+    configure_rate_limiter(args.rate)
+    configure_fixtures(args.replay or args.record, recording=bool(args.record))
+
+    genres = [genre.strip() for genre in (args.genre or input("Enter Genre: ")).split(',') if genre.strip()]
+
+    checkpoint = CrawlCheckpoint(CHECKPOINT_PATH)
+    sinks = {genre: output_sink(genre, resume=args.resume) for genre in genres}
+    skip_ids = set()
+    for genre, sink in sinks.items():
+        if args.resume:
+            recorded = {get_imdb_id(link) for link in sink.recorded_values('movie_imdb_id')}
+            recorded.discard(None)
+            checkpoint.reconcile(genre, recorded)
+            done = checkpoint.completed(genre)
+            given_up = checkpoint.exhausted(genre, args.max_attempts)
+            print(f"Resuming {genre}: {len(done)} titles already scraped, {len(checkpoint.failed(genre) - given_up)} failed titles to retry, "
+                  f"{len(given_up)} given up after {args.max_attempts} attempts")
+            skip_ids |= done | given_up
+        else:
+            checkpoint.reset(genre)
 
-    print("Data collection successful.")
+    def record(genre, movie_info):
+        sinks[genre].write(movie_info)
+        checkpoint.mark_done(genre, get_imdb_id(movie_info['movie_imdb_id']))
+
+    def record_failure(genre, item, error):
+        title_id = get_imdb_id(item['link'])
+        if title_id:
+            checkpoint.mark_failed(genre, title_id, error)
+
+    try:
+        links = iter_search_links(genres, args.limit, args.pages or None)
+        print("Processing movies...")
+        if args.use_async:
+            asyncio.run(stream_details_async(links, args.concurrency, record, skip_ids, record_failure, args.parse_workers))
+        elif args.parse_workers:
+            for genre, movie_info in iter_movie_details_pooled(links, args.parse_workers, args.concurrency, skip_ids, record_failure):
+                record(genre, movie_info)
+        else:
+            for genre, movie_info in iter_movie_details(links, skip_ids, record_failure):
+                record(genre, movie_info)
+
+        collected = False
+        for genre, sink in sinks.items():
+            if not sink.count:
+                print(f"No movie data collected for {genre}.")
+                continue
+            sink.finalize()
+            save_movie_store(genre, sink)
+            collected = True
+        if collected:
+            print("Data collection successful.")
+        else:
+            print("No movie data collected. Exiting.")
+    finally:
+        for sink in sinks.values():
+            sink.close()
+        checkpoint.close()
+
+    if response_cache is not None:
+        print(f"HTTP cache: {response_cache.stats}")
+    print(f"Rate limiter: {rate_limiter.stats()}")
+    if fixtures is not None:
+        print(f"Fixtures: {fixtures.stats}")
+    summary = metrics.summary()
+    print(f"Metrics: {json.dumps(summary, indent=2)}")
+    if args.metrics:
+        try:
+            with open(args.metrics, 'w', encoding='utf-8') as file:
+                json.dump(summary, file, indent=2)
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
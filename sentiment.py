@@ -0,0 +1,65 @@
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from textblob import TextBlob
+
+BATCH_CHUNKSIZE = 64
+
+_scores = {}
+_scores_lock = threading.Lock()
+
+
+def review_hash(text):
+    return hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+
+
+def polarity(text):
+    return TextBlob(text or '').sentiment.polarity
+
+
+def cached_polarity(text):
+    key = review_hash(text)
+    with _scores_lock:
+        if key in _scores:
+            return _scores[key]
+    score = polarity(text)
+    with _scores_lock:
+        _scores[key] = score
+    return score
+
+
+def sentiment_category(score):
+    if score > 0:
+        return 'Positive'
+    if score < 0:
+        return 'Negative'
+    return 'Neutral'
+
+
+def score_texts(texts, workers=None, known=None):
+    # Texts whose hash already has a score are not scored again; the rest can fan out across processes
+    texts = list(texts)
+    hashes = [review_hash(text) for text in texts]
+    known = dict(known or {})
+    with _scores_lock:
+        for key in hashes:
+            if key not in known and key in _scores:
+                known[key] = _scores[key]
+
+    pending = {}
+    for key, text in zip(hashes, texts):
+        if key not in known and key not in pending:
+            pending[key] = text
+
+    if pending:
+        if workers and workers > 1 and len(pending) > BATCH_CHUNKSIZE:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scores = list(pool.map(polarity, pending.values(), chunksize=BATCH_CHUNKSIZE))
+        else:
+            scores = [polarity(text) for text in pending.values()]
+        known.update(zip(pending, scores))
+        with _scores_lock:
+            _scores.update(zip(pending, scores))
+
+    return hashes, [known[key] for key in hashes]
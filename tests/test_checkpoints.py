@@ -0,0 +1,29 @@
+from checkpoints import CrawlCheckpoint
+
+
+def test_exhausted_after_max_attempts(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoints.sqlite'))
+    for _ in range(3):
+        checkpoint.mark_failed('action', 'tt1', "timeout")
+    checkpoint.mark_failed('action', 'tt2', "timeout")
+    assert checkpoint.failed('action') == {'tt1', 'tt2'}
+    assert checkpoint.exhausted('action', 3) == {'tt1'}
+    assert checkpoint.exhausted('drama', 3) == set()
+    checkpoint.close()
+
+
+def test_reconcile_with_output_log(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoints.sqlite'))
+    checkpoint.mark_done('action', 'tt1')
+    checkpoint.mark_done('action', 'tt2')
+    checkpoint.mark_failed('action', 'tt3', "timeout")
+    checkpoint.mark_failed('action', 'tt4', "timeout")
+    # tt2's record never reached the log; tt3 was written but the run stopped before it was checkpointed
+    checkpoint.reconcile('action', {'tt1', 'tt3'})
+    assert checkpoint.completed('action') == {'tt1', 'tt3'}
+    assert checkpoint.failed('action') == {'tt4'}
+    # A lost record isn't counted as a failed attempt
+    for _ in range(2):
+        checkpoint.mark_failed('action', 'tt2', "timeout")
+    assert checkpoint.exhausted('action', 3) == set()
+    checkpoint.close()
@@ -0,0 +1,45 @@
+from embedded_data import extract_embedded_fields, fields_from_ld_json, format_rating, format_release_date, format_weekend_date
+
+TITLE_PAGE = 'body_sites/movie_structure.html'
+
+
+def test_release_date_day_is_not_padded():
+    release_date = {'year': 2024, 'month': 5, 'day': 4, 'country': {'text': 'United States'}}
+    assert format_release_date(release_date) == 'May 4, 2024 (United States)'
+    assert format_release_date({'year': 2024, 'month': 11, 'day': 22}) == 'November 22, 2024'
+
+
+def test_release_date_needs_every_part():
+    assert format_release_date({'year': 2024, 'month': 5}) is None
+    assert format_release_date(None) is None
+
+
+def test_weekend_date_day_is_not_padded():
+    assert format_weekend_date('2024-06-02') == 'Jun 2, 2024'
+    assert format_weekend_date('2024-05-26') == 'May 26, 2024'
+    assert format_weekend_date('last weekend') is None
+
+
+def test_rating_accepts_numbers_and_strings():
+    assert format_rating(7.8) == ['7.8', '/', '10']
+    assert format_rating(8) == ['8.0', '/', '10']
+    assert format_rating('6.5') == ['6.5', '/', '10']
+
+
+def test_rating_skips_values_that_are_not_numbers():
+    assert format_rating(None) is None
+    assert format_rating('N/A') is None
+
+
+def test_ld_json_rating_given_as_string():
+    fields = fields_from_ld_json({'name': 'Title', 'aggregateRating': {'ratingValue': '6.5'}})
+    assert fields['Ratings'] == ['6.5', '/', '10']
+    assert 'Ratings' not in fields_from_ld_json({'name': 'Title', 'aggregateRating': {'ratingValue': ''}})
+
+
+def test_title_page_dates():
+    with open(TITLE_PAGE, 'rb') as file:
+        fields = extract_embedded_fields(file.read())
+    assert fields['Details']['Release-Date'] == 'May 24, 2024 (United States)'
+    assert fields['BoxOfficeDetails']['Opening weekend US & Canada']['Date'] == 'May 26, 2024'
+    assert fields['Ratings'] == ['7.8', '/', '10']
@@ -0,0 +1,64 @@
+import sys
+
+import pytest
+
+import scrape_data
+import title_parser
+from scrape_data import create_parse_pool
+from title_parser import available_parser_backends, extract_title_page, parse_title_pages
+
+TITLE_PAGE = 'body_sites/movie_structure.html'
+LINK = '/title/tt12037194/'
+
+
+@pytest.fixture(scope='module')
+def parse_pool():
+    pool = create_parse_pool(1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def title_page():
+    with open(TITLE_PAGE, 'rb') as file:
+        return file.read(), 'utf-8'
+
+
+def loaded_modules():
+    import scrape_data
+    return scrape_data.response_cache, [name for name in ('movie_store', 'pandas') if name in sys.modules]
+
+
+@pytest.mark.parametrize('parser', available_parser_backends())
+def test_dom_mode_in_worker(parse_pool, title_page, parser):
+    movie_info, recorded = parse_pool.submit(parse_title_pages, LINK, title_page, None, parser, 'dom').result()
+    assert movie_info == extract_title_page(*title_page, LINK, [], parser, 'dom')
+    # Credits come back as plain strings rather than tags still tied to the worker's DOM
+    for field in ('Directors', 'Writers', 'Stars'):
+        assert movie_info[field]
+        assert all(type(name) is str for name in movie_info[field])
+    assert ('parse', (('parser', parser),)) in recorded['timings']
+    assert ('extract', (('extractor', 'credits'),)) in recorded['timings']
+
+
+def test_auto_mode_in_worker(parse_pool, title_page):
+    movie_info, recorded = parse_pool.submit(parse_title_pages, LINK, title_page, None, None, 'auto').result()
+    assert movie_info['Directors'] == ['George Miller']
+    assert movie_info['Details']['Release-Date'] == 'May 24, 2024 (United States)'
+    # The fixture's embedded JSON has every field, so no DOM is built
+    assert not any(name == 'parse' for name, _ in recorded['timings'])
+
+
+def test_worker_stays_light(parse_pool):
+    cache, heavy = parse_pool.submit(loaded_modules).result()
+    assert cache is None
+    assert heavy == []
+
+
+def test_scrape_data_still_exports_the_extractors():
+    for name in (
+        'get_movie_name', 'extract_year_duration', 'extract_rating', 'extract_review_info', 'get_storyline',
+        'get_directors_writers_stars', 'get_details', 'get_box_office_details', 'extract_user_reviews',
+        'extract_movie_info', 'parse_html'
+    ):
+        assert getattr(scrape_data, name) is getattr(title_parser, name)
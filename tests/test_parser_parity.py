@@ -0,0 +1,56 @@
+import pytest
+
+from parser_parity import SEARCH_PAGES, TITLE_EXTRACTORS, TITLE_PAGES, run_extractors
+from title_parser import available_parser_backends, default_parser_backend
+
+REFERENCE = 'html.parser'
+
+results = {}
+
+
+def extractor_results(path, parser):
+    if (path, parser) not in results:
+        results[(path, parser)] = run_extractors(path, parser)
+    return results[(path, parser)]
+
+
+def extractor_cases():
+    for path in TITLE_PAGES:
+        for name in [extractor.__name__ for extractor in TITLE_EXTRACTORS] + ['extract_movie_info', 'extract_user_reviews']:
+            yield path, name
+    for path in SEARCH_PAGES:
+        yield path, 'get_movie_name_and_links'
+        yield path, 'extract_user_reviews'
+
+
+@pytest.mark.parametrize('parser', available_parser_backends())
+@pytest.mark.parametrize('path, name', list(extractor_cases()))
+def test_extractor_runs(path, name, parser):
+    result = extractor_results(path, parser)[name]
+    assert result is not None
+    assert not (isinstance(result, str) and result.startswith('raised '))
+
+
+@pytest.mark.parametrize('parser', [name for name in available_parser_backends() if name != REFERENCE])
+@pytest.mark.parametrize('path, name', list(extractor_cases()))
+def test_extractor_matches_html_parser(path, name, parser):
+    assert extractor_results(path, parser)[name] == extractor_results(path, REFERENCE)[name]
+
+
+@pytest.mark.parametrize('parser', available_parser_backends())
+def test_search_page_finds_movies(parser):
+    for path in SEARCH_PAGES:
+        movies = extractor_results(path, parser)['get_movie_name_and_links']
+        assert movies
+        assert all(movie['link'].startswith('/title/tt') for movie in movies)
+
+
+def test_unknown_parser_from_environment_falls_back(monkeypatch, capsys):
+    monkeypatch.setenv('IMDB_PARSER', 'lxmll')
+    assert default_parser_backend() == available_parser_backends()[0]
+    assert "Ignoring IMDB_PARSER='lxmll'" in capsys.readouterr().out
+
+
+def test_parser_from_environment(monkeypatch):
+    monkeypatch.setenv('IMDB_PARSER', 'html.parser')
+    assert default_parser_backend() == 'html.parser'
@@ -0,0 +1,59 @@
+import pytest
+
+import title_parser
+from title_parser import extract_title_page
+
+TITLE_PAGE = 'body_sites/movie_structure.html'
+LINK = '/title/tt12037194/'
+
+
+@pytest.fixture
+def content():
+    with open(TITLE_PAGE, 'rb') as file:
+        return file.read()
+
+
+def without_next_data(content):
+    return content.replace(b'id="__NEXT_DATA__"', b'id="__NEXT_DATA_REMOVED__"')
+
+
+def without_embedded_data(content):
+    return without_next_data(content).replace(b'type="application/ld+json"', b'type="text/plain"')
+
+
+def test_auto_mode_fills_missing_fields_from_the_dom(content):
+    movie_info = extract_title_page(without_next_data(content), 'utf-8', LINK, [], mode='auto')
+    dom_info = extract_title_page(content, 'utf-8', LINK, [], mode='dom')
+    # ld+json has the name, runtime, rating and credits; the rest comes from the DOM
+    assert movie_info['Directors'] == ['George Miller']
+    assert movie_info['ReviewRelatedInfo'] == dom_info['ReviewRelatedInfo']
+    assert movie_info['Details'] == dom_info['Details']
+
+
+def test_auto_mode_without_embedded_data_matches_dom_mode(content):
+    page = without_embedded_data(content)
+    assert extract_title_page(page, 'utf-8', LINK, [], mode='auto') == extract_title_page(page, 'utf-8', LINK, [], mode='dom')
+
+
+def test_embedded_fields_survive_a_failing_dom_pass(content, monkeypatch):
+    def broken_parse(*args):
+        raise ValueError("broken page")
+    monkeypatch.setattr(title_parser, 'parse_html', broken_parse)
+    movie_info = extract_title_page(without_next_data(content), 'utf-8', LINK, [], mode='auto')
+    assert movie_info['movie_name'] == 'Furiosa: A Mad Max Saga'
+    assert movie_info['Ratings'] == ['7.8', '/', '10']
+    assert movie_info['Details'] == {}
+    assert movie_info['FilmPlot'] == 'No storyline found'
+
+
+def test_one_broken_section_keeps_the_others(content):
+    page = without_embedded_data(content).replace(b'title-pc-list', b'title-pc-list-removed')
+    movie_info = extract_title_page(page, 'utf-8', LINK, [], mode='auto')
+    assert movie_info['Directors'] == []
+    assert movie_info['Ratings'] == ['7.8', '/', '10']
+    assert extract_title_page(page, 'utf-8', LINK, [], mode='dom') is None
+
+
+def test_fails_when_neither_pass_finds_anything(monkeypatch):
+    monkeypatch.setattr(title_parser, 'parse_html', lambda *args: None)
+    assert extract_title_page(b'<html></html>', 'utf-8', LINK, [], mode='auto') is None
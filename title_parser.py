@@ -0,0 +1,402 @@
+from bs4 import BeautifulSoup, UnicodeDammit
+from bs4.builder import builder_registry
+import copy
+import os
+from embedded_data import TITLE_FIELDS, extract_embedded_fields
+from metrics import metrics
+
+# Everything that turns fetched page bytes into movie data; parse worker processes import only this module
+
+PARSER_BACKENDS = ('lxml', 'html.parser')
+
+def available_parser_backends():
+    return [name for name in PARSER_BACKENDS if builder_registry.lookup(name) is not None]
+
+def default_parser_backend():
+    name = os.environ.get('IMDB_PARSER')
+    available = available_parser_backends()
+    if name and name not in available:
+        print(f"Ignoring IMDB_PARSER='{name}': not an installed parser backend (available: {', '.join(available)})")
+        name = None
+    return name or available[0]
+
+PARSER_BACKEND = default_parser_backend()
+
+def set_parser_backend(name):
+    global PARSER_BACKEND
+    if name not in available_parser_backends():
+        raise ValueError(f"Parser backend '{name}' is not installed (available: {', '.join(available_parser_backends())})")
+    PARSER_BACKEND = name
+
+def parse_html(content, encoding=None, parser=None):
+    parser = parser or PARSER_BACKEND
+    with metrics.span('decode'):
+        # Normalize newlines the way the HTML spec does, so html.parser sees the same text as lxml
+        content = content.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        # Decoded the same way BeautifulSoup would, but up front so decoding and tree building are timed apart
+        markup = UnicodeDammit(content, [encoding] if encoding else [], is_html=True).unicode_markup
+    with metrics.span('parse', parser=parser):
+        if markup is None:
+            return BeautifulSoup(content, parser, from_encoding=encoding)
+        return BeautifulSoup(markup, parser)
+
+TITLE_SELECTORS = {
+    'name': ('span', 'class', 'hero__primary-text'),
+    'year_duration': ('ul', 'class', 'ipc-inline-list ipc-inline-list--show-dividers sc-d8941411-2 cdJsTz baseAlt'),
+    'rating': ('div', 'data-testid', 'hero-rating-bar__aggregate-rating__score'),
+    'review_info': ('span', 'class', 'three-Elements'),
+    'storyline': ('div', 'class', 'ipc-html-content-inner-div'),
+    'credits': ('ul', 'class', 'ipc-metadata-list ipc-metadata-list--dividers-all title-pc-list ipc-metadata-list--baseAlt'),
+    'details': ('section', 'data-testid', 'Details'),
+    'box_office': ('section', 'data-testid', 'BoxOffice')
+}
+
+# Fields collected with find_all() semantics; every other field keeps only its first match
+MULTI_MATCH_FIELDS = {'review_info'}
+
+TITLE_SELECTORS_BY_TAG = {}
+for field, (tag_name, attr, value) in TITLE_SELECTORS.items():
+    TITLE_SELECTORS_BY_TAG.setdefault(tag_name, []).append((field, attr, value))
+
+def find_section(body, field):
+    tag_name, attr, value = TITLE_SELECTORS[field]
+    if field in MULTI_MATCH_FIELDS:
+        return body.find_all(tag_name, {attr: value})
+    return body.find(tag_name, {attr: value})
+
+def attr_matches(tag, attr, value):
+    actual = tag.get(attr)
+    if actual is None:
+        return False
+    if isinstance(actual, list):
+        return value in actual or ' '.join(actual) == value
+    return actual == value
+
+def locate_title_sections(body):
+    sections = {field: [] if field in MULTI_MATCH_FIELDS else None for field in TITLE_SELECTORS}
+    for tag in body.descendants:
+        candidates = TITLE_SELECTORS_BY_TAG.get(tag.name)
+        if not candidates:
+            continue
+        for field, attr, value in candidates:
+            if field in MULTI_MATCH_FIELDS:
+                if attr_matches(tag, attr, value):
+                    sections[field].append(tag)
+            elif sections[field] is None and attr_matches(tag, attr, value):
+                sections[field] = tag
+    return sections
+
+def get_movie_name(body):
+    return parse_movie_name(find_section(body, 'name'))
+
+def parse_movie_name(node):
+    return node.get_text()
+
+
+def extract_year_duration(body):
+    return parse_year_duration(find_section(body, 'year_duration'))
+
+def parse_year_duration(info):
+    try:
+        if info:
+            result = [s.strip() for s in info.stripped_strings]
+            return result
+    except Exception as e:
+        metrics.increment('extractor_failures', extractor='year_duration')
+        print(f"Error extracting year and duration: {e}")
+    return "N/A"
+
+def extract_rating(body):
+    return parse_rating(find_section(body, 'rating'))
+
+def parse_rating(res):
+    try:
+        if res:
+            result = [s.strip() for s in res.stripped_strings]
+            return result
+    except Exception as e:
+        metrics.increment('extractor_failures', extractor='rating')
+        print(f"Error extracting rating: {e}")
+    return "No rating found"
+
+def extract_review_info(movie_body):
+    return parse_review_info(find_section(movie_body, 'review_info'))
+
+def parse_review_info(reviews):
+    store = []
+    try:
+        if reviews:
+            for data in reviews:
+                header = data.find('span', class_='label').get_text(strip=True)
+                score = data.find('span', class_='score').get_text(strip=True)
+                store.append({header: score})
+    except Exception as e:
+        metrics.increment('extractor_failures', extractor='review_info')
+        print(f"Error extracting review info: {e}")
+    return store
+
+def get_storyline(movie_body):
+    return parse_storyline(find_section(movie_body, 'storyline'))
+
+def parse_storyline(text):
+    if text:
+        story = ' '.join([s.strip() for s in text.stripped_strings])
+        return story
+    else:
+        return "No storyline found"
+        # return " "
+    
+def parse_review_page(content, encoding, parser=None):
+    try:
+        review_body = parse_html(content, encoding, parser)
+    except Exception as e:
+        metrics.increment('extractor_failures', extractor='parse_html')
+        print(f"An error occurred: {e}")
+        review_body = None
+    return extract_user_reviews(review_body)
+
+def extract_user_reviews(review_body):
+    reviews = []
+
+    if review_body:
+        try:
+            with metrics.span('extract', extractor='user_reviews'):
+                for each in review_body.find_all('div', class_='review-container'):
+                    rating_elem = each.find('span', class_="point-scale")
+                    rating = rating_elem.find_previous_sibling('span').text.strip() if rating_elem else "0"
+                    title = each.find('a', class_='title').text.strip()
+                    review_content = each.find('div', class_='content').text.strip()
+                    reviews.append({"Rating": rating, "Title": title, "Content": review_content})
+        except Exception as e:
+            metrics.increment('extractor_failures', extractor='user_reviews')
+            print(f"Error extracting user reviews: {e}")
+    return reviews
+
+def get_directors_writers_stars(body):
+    return parse_directors_writers_stars(find_section(body, 'credits'))
+
+def parse_directors_writers_stars(section):
+    Directors = []
+    Writers = []
+    Stars = []
+    items = section.find_all('li' , class_ = 'ipc-metadata-list__item')
+    
+    for dir_name in items[0].strings:
+        if dir_name != 'Directors' :
+            Directors.append(str(dir_name))
+
+    for writer_name in items[1].strings:
+        if writer_name != 'Writers' :
+            Writers.append(str(writer_name))
+
+    for star_name in items[2].strings:
+        if star_name !=  'Stars':
+            Stars.append(str(star_name))
+
+    return Directors,Writers,Stars
+
+def get_details(body):
+    return parse_details(find_section(body, 'details'))
+
+def parse_details(details):
+    if not details:
+        return {}
+    items = details.find_all('li')
+
+    release_date = 'N/A'
+    origin_country = 'N/A'
+    language = 'N/A'
+
+    try:
+        release_date = items[1].text
+    except (IndexError, AttributeError):
+        pass
+
+    try:
+        origin_country = items[3].text
+    except (IndexError, AttributeError):
+        pass
+
+    try:
+        language = items[7].text
+    except (IndexError, AttributeError):
+        pass
+
+    info = {
+        'Release-Date': release_date,
+        'Country-Origin': origin_country,
+        'Language': language
+    }
+
+    return info
+
+def get_box_office_details(body):
+    return parse_box_office_details(find_section(body, 'box_office'))
+
+def parse_box_office_details(box_office_body):
+    data = {}
+    if not box_office_body:
+        return data
+    items = box_office_body.find_all('li')
+
+    try:
+        budget_text = items[0].get_text()
+        data['Budget'] = '$' + budget_text.split('$')[1]
+    except (IndexError, AttributeError, IndexError):
+        data['Budget'] = 'N/A'
+
+    try:
+        revenue_text = items[2].get_text()
+        key = revenue_text.split('$')[0]
+        value = '$' + revenue_text.split('$')[1]
+        data[key] = value
+    except (IndexError, AttributeError, IndexError):
+        pass
+
+    try:
+        text = items[4].get_text()
+        dollar_index = text.find('$')
+        date_index = next(i for i in range(dollar_index + 1, len(text)) if text[i].isalpha())
+        location = text[:dollar_index]
+        collections = text[dollar_index:date_index]
+        date = text[date_index:]
+        data[location] = {'Collection': collections, 'Date': date}
+    except (IndexError, AttributeError, StopIteration):
+        pass
+
+    try:
+        other_revenue_text = items[7].get_text()
+        key = other_revenue_text.split('$')[0]
+        value = '$' + other_revenue_text.split('$')[1]
+        data[key] = value
+    except (IndexError, AttributeError, IndexError):
+        pass
+
+    return data
+
+
+EXTRACTION_MODES = ('auto', 'dom')
+EXTRACTION_MODE = 'auto'
+
+def set_extraction_mode(mode):
+    global EXTRACTION_MODE
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown extraction mode '{mode}' (expected one of: {', '.join(EXTRACTION_MODES)})")
+    EXTRACTION_MODE = mode
+
+# Section, parser and the movie fields it fills, for reading single fields from the DOM
+DOM_FIELD_EXTRACTORS = (
+    ('name', parse_movie_name, ('movie_name',)),
+    ('year_duration', parse_year_duration, ('YearDuration',)),
+    ('rating', parse_rating, ('Ratings',)),
+    ('review_info', parse_review_info, ('ReviewRelatedInfo',)),
+    ('storyline', parse_storyline, ('FilmPlot',)),
+    ('credits', parse_directors_writers_stars, ('Directors', 'Writers', 'Stars')),
+    ('details', parse_details, ('Details',)),
+    ('box_office', parse_box_office_details, ('BoxOfficeDetails',))
+)
+
+# Given to a field that neither the embedded JSON nor the DOM could provide
+MISSING_FIELDS = {
+    'movie_name': '', 'YearDuration': 'N/A', 'Ratings': 'No rating found', 'ReviewRelatedInfo': [],
+    'FilmPlot': 'No storyline found', 'Directors': [], 'Writers': [], 'Stars': [], 'Details': {}, 'BoxOfficeDetails': {}
+}
+
+def extract_dom_fields(content, encoding, link, wanted, parser=None):
+    # Each field is read on its own, so one broken section doesn't cost the others
+    fields = {}
+    try:
+        sections = run_extractor('locate_sections', locate_title_sections, parse_html(content, encoding, parser))
+    except Exception as e:
+        metrics.increment('extractor_failures', extractor='locate_sections')
+        print(f"Error parsing the title page for {link}: {e}")
+        return fields
+    for section, extractor, names in DOM_FIELD_EXTRACTORS:
+        if not any(name in wanted for name in names):
+            continue
+        try:
+            values = run_extractor(section, extractor, sections[section])
+        except Exception as e:
+            metrics.increment('extractor_failures', extractor=section)
+            print(f"Error extracting {section} for {link}: {e}")
+            continue
+        fields.update(zip(names, values if len(names) > 1 else (values,)))
+    return fields
+
+def extract_title_page(content, encoding, link, user_reviews, parser=None, mode=None):
+    if (mode or EXTRACTION_MODE) == 'dom':
+        return extract_movie_info(parse_html(content, encoding, parser), link, user_reviews)
+
+    # In auto mode the embedded JSON is read straight from the bytes; the DOM is only built for fields it lacks
+    fields = run_extractor('embedded_fields', extract_embedded_fields, content)
+    missing = [field for field in TITLE_FIELDS if field not in fields]
+    if missing:
+        fields.update(extract_dom_fields(content, encoding, link, missing, parser))
+    if not fields:
+        return None
+    for field in missing:
+        fields.setdefault(field, copy.copy(MISSING_FIELDS[field]))
+    return build_movie_info(fields, link, user_reviews)
+
+def parse_title_pages(link, title_page, review_page, parser=None, mode=None):
+    # Runs in a parse worker process: raw page bytes go in, and a plain movie dict and the metrics recorded
+    # while building it come out (each worker handles one task at a time)
+    metrics.reset()
+    user_reviews = parse_review_page(*review_page, parser) if review_page else []
+    movie_info = extract_title_page(*title_page, link, user_reviews, parser, mode)
+    return movie_info, metrics.snapshot()
+
+MOVIE_FIELDS = (
+    'movie_name', 'movie_imdb_id', 'YearDuration', 'Ratings', 'ReviewRelatedInfo', 'FilmPlot',
+    'UserReviews', 'Directors', 'Writers', 'Stars', 'Details', 'BoxOfficeDetails', 'name'
+)
+
+def build_movie_info(fields, link, user_reviews):
+    return {
+        "movie_name" :  fields['movie_name'],
+        "movie_imdb_id": link,
+        "YearDuration": fields['YearDuration'],
+        "Ratings": fields['Ratings'],
+        "ReviewRelatedInfo": fields['ReviewRelatedInfo'],
+        "FilmPlot": fields['FilmPlot'],
+        "UserReviews": user_reviews,
+        "Directors": fields['Directors'],
+        "Writers": fields['Writers'],
+        "Stars": fields['Stars'],
+        "Details": fields['Details'],
+        "BoxOfficeDetails": fields['BoxOfficeDetails']
+    }
+
+def run_extractor(name, extractor, *args):
+    with metrics.span('extract', extractor=name):
+        return extractor(*args)
+
+def extract_movie_info(movie_body, link, user_reviews):
+    try:
+        sections = run_extractor('locate_sections', locate_title_sections, movie_body)
+        movie_name = run_extractor('movie_name', parse_movie_name, sections['name'])
+        year_duration = run_extractor('year_duration', parse_year_duration, sections['year_duration'])
+        ratings = run_extractor('rating', parse_rating, sections['rating'])
+        review_related_info = run_extractor('review_info', parse_review_info, sections['review_info'])
+        film_plot = run_extractor('storyline', parse_storyline, sections['storyline'])
+        Directors, Writers, Stars = run_extractor('credits', parse_directors_writers_stars, sections['credits'])
+        details_section = run_extractor('details', parse_details, sections['details'])
+        box_office_details = run_extractor('box_office', parse_box_office_details, sections['box_office'])
+
+        movie_info = build_movie_info({
+            "movie_name": movie_name,
+            "YearDuration": year_duration,
+            "Ratings": ratings,
+            "ReviewRelatedInfo": review_related_info,
+            "FilmPlot": film_plot,
+            "Directors": Directors,
+            "Writers": Writers,
+            "Stars": Stars,
+            "Details": details_section,
+            "BoxOfficeDetails": box_office_details
+        }, link, user_reviews)
+        return movie_info
+    except Exception as e:
+        metrics.increment('extractor_failures', extractor='movie_info')
+        print(f"Error extracting movie info for {link}: {e}")
+        return None